@@ -19,26 +19,70 @@ class PointCharge:
 
 
 # Function for calculating the electric field from one charge
-def electric_field(charge, X, Y):
+def electric_field(charge, X, Y, unit=1.0):
     """
     Calculation of the electric field from a single point charge
 
     :param charge: PointCharge object
     :param X: Coordinate grid along the X axis
     :param Y: Coordinate grid along the Y axis
+    :param unit: Unit of the result (e.g. k*q_max for float32 grids); the field keeps the dtype of the grid
     :return: Electric field components Ex and Ey
     """
-    dx = X - charge.position[0]
-    dy = Y - charge.position[1]
+    dx = X - X.dtype.type(charge.position[0])
+    dy = Y - Y.dtype.type(charge.position[1])
     r_squared = dx ** 2 + dy ** 2
-    r = np.sqrt(r_squared)
     # Avoid division by zero
     r_squared[r_squared == 0] = 1e-20
-    Ex = k * charge.q * dx / r_squared ** (3 / 2)
-    Ey = k * charge.q * dy / r_squared ** (3 / 2)
+    factor = X.dtype.type(k * charge.q / unit) / (r_squared * np.sqrt(r_squared))
+    Ex = factor * dx
+    Ey = factor * dy
     return Ex, Ey
 
 
+# Function for calculating the field of all charges on a grid
+def field_maps(charges, x, y, dtype=np.float64):
+    """
+    Calculation of the total electric field on a grid in the given precision
+
+    The sum is taken in units of k*q_max, so float32 stays far from overflow next to the charges
+    (k*q/r^3 reaches 1e30 / C on a charge) whatever the size of the charges.
+
+    :param charges: List of PointCharge objects
+    :param x: Grid coordinates along the X axis
+    :param y: Grid coordinates along the Y axis
+    :param dtype: np.float64, or np.float32 for half the memory
+    :return: X, Y, Ex, Ey (in units of k*q_max) and the unit k*q_max (1 without charges)
+    """
+    q_max = max((abs(charge.q) for charge in charges), default=0.0)
+    unit = k * q_max if q_max > 0 else 1.0
+    X, Y = np.meshgrid(np.asarray(x, dtype=dtype), np.asarray(y, dtype=dtype))
+    Ex_total = np.zeros_like(X)
+    Ey_total = np.zeros_like(Y)
+    for charge in charges:
+        Ex, Ey = electric_field(charge, X, Y, unit)
+        Ex_total += Ex
+        Ey_total += Ey
+    return X, Y, Ex_total, Ey_total, unit
+
+
+# Function for comparing reduced-precision fields with float64
+def precision_report(maps, charges, x, y):
+    """
+    Print the relative error of |E| from already computed maps against a float64 run
+
+    Near zeros of |E| the error is taken relative to the median magnitude.
+
+    :param maps: Result of field_maps in a reduced precision
+    """
+    _, _, Ex, Ey, unit = maps
+    _, _, Ex_reference, Ey_reference, unit_reference = field_maps(charges, x, y)
+    values = np.hypot(Ex.astype(np.float64), Ey.astype(np.float64)) * unit
+    reference = np.hypot(Ex_reference, Ey_reference) * unit_reference
+    error = np.abs(values - reference) / np.maximum(reference, np.median(reference))
+    print(f"{Ex.dtype.name} vs float64, |E|: median relative error {np.median(error):.1e}, max {error.max():.1e}")
+
+
 # Create a list of point charges
 charges = [
     PointCharge(1e-9, (0, 0)),  # Positive charge at the origin
@@ -47,20 +91,20 @@ charges = [
     PointCharge(-1e-9, (-1, 0))  # Another negative charge
 ]
 
+# Precision of the field maps: np.float32 halves the memory of the grids
+dtype = np.float64
+# Compare reduced-precision maps with an extra float64 run
+check_precision = False
+
 # Create a grid of points to visualize the field
 x = np.linspace(-2, 2, 400)
 y = np.linspace(-2, 2, 400)
-X, Y = np.meshgrid(x, y)
-
-# Initialize electric field components
-Ex_total = np.zeros_like(X)
-Ey_total = np.zeros_like(Y)
 
-# Summation of fields from all charges
-for charge in charges:
-    Ex, Ey = electric_field(charge, X, Y)
-    Ex_total += Ex
-    Ey_total += Ey
+# Summation of fields from all charges, in units of k*q_max
+maps = field_maps(charges, x, y, dtype)
+X, Y, Ex_total, Ey_total, unit = maps
+if check_precision and dtype != np.float64:
+    precision_report(maps, charges, x, y)
 
 # Normalize field vectors to display directions
 E_magnitude = np.sqrt(Ex_total ** 2 + Ey_total ** 2)
@@ -71,7 +115,7 @@ Ey_norm = Ey_total / E_magnitude
 
 # Plot a graph
 plt.figure(figsize=(8, 8))
-plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude), cmap='inferno', density=1.2, linewidth=1)
+plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude) + np.log(unit), cmap='inferno', density=1.2, linewidth=1)
 plt.colorbar(label='Logarithm of the magnitude of the electric field')
 
 # Display point charges
@@ -0,0 +1,400 @@
+import numpy as np
+from scipy.special import ellipe, ellipk
+
+# Coulomb's constant
+k = 8.988e9  # Coulomb's constant in N·m²/C²
+
+# Squared distances are clamped to this value on the charge itself
+TINY = 1e-20
+
+
+def _points(X, Y, Z=None):
+    # Grid coordinates as an (..., 3) array of points; the plane z = 0 by default
+    Z = np.zeros_like(X, dtype=float) if Z is None else Z
+    return np.stack(np.broadcast_arrays(X, Y, Z), axis=-1).astype(float)
+
+
+def _vector(value):
+    # 2D vectors are placed in the plane z = 0
+    vector = np.zeros(3)
+    vector[:len(value)] = value
+    return vector
+
+
+def _log_sum(u, r, rest_squared):
+    """
+    ln(u + r) with r = sqrt(u^2 + rest^2), without cancellation for negative u.
+
+    For u < 0 the identity u + r = rest^2 / (r - u) is used.
+    """
+    rest_squared = np.maximum(rest_squared, TINY)
+    return np.where(u >= 0, np.log(np.abs(u) + r), np.log(rest_squared) - np.log(r - np.minimum(u, 0)))
+
+
+class LineCharge:
+    def __init__(self, q, start, end):
+        """
+        Initialize a uniformly charged straight segment
+
+        :param q: Total charge in coulombs (C)
+        :param start: Coordinates (x, y) or (x, y, z) of the first end
+        :param end: Coordinates (x, y) or (x, y, z) of the second end
+        """
+        self.q = q
+        self.start = _vector(start)
+        self.end = _vector(end)
+        self.length = np.linalg.norm(self.end - self.start)
+        self.direction = (self.end - self.start) / self.length
+        self.density = q / self.length
+
+    def _local(self, points):
+        # Coordinates of the segment ends relative to the foot of the perpendicular, and the distance to the line
+        relative = points - self.start
+        along = relative @ self.direction
+        perpendicular = relative - along[..., np.newaxis] * self.direction
+        d_squared = np.einsum('...i,...i->...', perpendicular, perpendicular)
+        u1 = -along
+        u2 = self.length - along
+        return u1, u2, perpendicular, d_squared
+
+    def field_3d(self, points):
+        """
+        Closed-form field of the segment at points (..., 3)
+
+        :return: Field vectors (..., 3)
+        """
+        u1, u2, perpendicular, d_squared = self._local(points)
+        d_squared = np.maximum(d_squared, TINY)
+        r1 = np.sqrt(u1 ** 2 + d_squared)
+        r2 = np.sqrt(u2 ** 2 + d_squared)
+        # E_parallel = k*lambda*(1/r2 - 1/r1), E_perp = k*lambda/d*(u2/r2 - u1/r1)
+        E_parallel = k * self.density * (1 / r2 - 1 / r1)
+        E_perp_over_d = k * self.density * (u2 / r2 - u1 / r1) / d_squared
+        return E_parallel[..., np.newaxis] * self.direction + E_perp_over_d[..., np.newaxis] * perpendicular
+
+    def potential_3d(self, points):
+        """
+        Closed-form potential of the segment: V = k*lambda*ln((u2 + r2) / (u1 + r1))
+        """
+        u1, u2, _, d_squared = self._local(points)
+        r1 = np.sqrt(u1 ** 2 + d_squared)
+        r2 = np.sqrt(u2 ** 2 + d_squared)
+        return k * self.density * (_log_sum(u2, r2, d_squared) - _log_sum(u1, r1, d_squared))
+
+    def field(self, X, Y):
+        E = self.field_3d(_points(X, Y))
+        return E[..., 0], E[..., 1]
+
+    def potential(self, X, Y):
+        return self.potential_3d(_points(X, Y))
+
+    def outline(self):
+        # Projection onto the plane of the grid for plotting
+        return np.array([self.start[0], self.end[0]]), np.array([self.start[1], self.end[1]])
+
+
+class RingCharge:
+    def __init__(self, q, center, radius, normal=(0, 0, 1)):
+        """
+        Initialize a uniformly charged thin ring
+
+        :param q: Total charge in coulombs (C)
+        :param center: Coordinates (x, y) or (x, y, z) of the ring center
+        :param radius: Ring radius (m)
+        :param normal: Direction of the ring axis; (0, 0, 1) puts the ring in the plane of the grid
+        """
+        self.q = q
+        self.center = _vector(center)
+        self.radius = radius
+        self.normal = _vector(normal) / np.linalg.norm(normal)
+
+    def _local(self, points):
+        # Axial coordinate z and radial vector from the axis
+        relative = points - self.center
+        z = relative @ self.normal
+        radial = relative - z[..., np.newaxis] * self.normal
+        rho = np.sqrt(np.einsum('...i,...i->...', radial, radial))
+        a = self.radius
+        far_squared = (a + rho) ** 2 + z ** 2
+        near_squared = np.maximum((a - rho) ** 2 + z ** 2, TINY)
+        m = 4 * a * rho / far_squared
+        return z, radial, rho, far_squared, near_squared, m
+
+    def field_3d(self, points):
+        """
+        Closed-form field of the ring (complete elliptic integrals K and E of parameter m)
+
+        :return: Field vectors (..., 3)
+        """
+        z, radial, rho, far_squared, near_squared, m = self._local(points)
+        a = self.radius
+        K, E = ellipk(m), ellipe(m)
+        far = np.sqrt(far_squared)
+        # E_z = (2kq/pi) * z * E(m) / (near^2 * far)
+        E_z = 2 * k * self.q / np.pi * z * E / (near_squared * far)
+        # E_rho = (kq/(pi*rho*far)) * [K(m) - (a^2 - rho^2 + z^2) / near^2 * E(m)], finite on the axis
+        rho_safe = np.where(rho > 0, rho, 1.0)
+        E_rho = k * self.q / (np.pi * rho_safe * far) * (K - (a ** 2 - rho ** 2 + z ** 2) / near_squared * E)
+        E_rho = np.where(rho > 0, E_rho, 0.0)
+        return E_z[..., np.newaxis] * self.normal + (E_rho / rho_safe)[..., np.newaxis] * radial
+
+    def potential_3d(self, points):
+        """
+        Closed-form potential of the ring: V = (2kq/pi) * K(m) / sqrt((a + rho)^2 + z^2)
+        """
+        z, radial, rho, far_squared, near_squared, m = self._local(points)
+        return 2 * k * self.q / np.pi * ellipk(np.minimum(m, 1 - TINY)) / np.sqrt(far_squared)
+
+    def field(self, X, Y):
+        E = self.field_3d(_points(X, Y))
+        return E[..., 0], E[..., 1]
+
+    def potential(self, X, Y):
+        return self.potential_3d(_points(X, Y))
+
+    def outline(self):
+        e1 = np.cross(self.normal, [1.0, 0, 0] if abs(self.normal[0]) < 0.9 else [0, 1.0, 0])
+        e1 /= np.linalg.norm(e1)
+        e2 = np.cross(self.normal, e1)
+        angles = np.linspace(0, 2 * np.pi, 101)[:, np.newaxis]
+        ring = self.center + self.radius * (np.cos(angles) * e1 + np.sin(angles) * e2)
+        return ring[:, 0], ring[:, 1]
+
+
+class SheetCharge:
+    def __init__(self, q, corner, edge1, edge2):
+        """
+        Initialize a uniformly charged rectangular sheet
+
+        :param q: Total charge in coulombs (C)
+        :param corner: Coordinates of one corner (x, y) or (x, y, z)
+        :param edge1: Vector along the first edge from the corner
+        :param edge2: Vector along the second edge from the corner (perpendicular to edge1)
+        """
+        self.q = q
+        self.corner = _vector(corner)
+        edge1, edge2 = _vector(edge1), _vector(edge2)
+        self.a = np.linalg.norm(edge1)
+        self.b = np.linalg.norm(edge2)
+        self.e1 = edge1 / self.a
+        self.e2 = edge2 / self.b
+        self.n = np.cross(self.e1, self.e2)
+        self.density = q / (self.a * self.b)
+
+    @classmethod
+    def plate(cls, q, start, end, depth):
+        """
+        A plate seen edge-on: the segment start-end in the plane of the grid,
+        extended by depth/2 to both sides of the plane
+
+        :param q: Total charge in coulombs (C)
+        :param start: Coordinates (x, y) of one end of the plate section
+        :param end: Coordinates (x, y) of the other end of the plate section
+        :param depth: Size of the plate across the plane of the grid (m)
+        """
+        corner = _vector(start) - np.array([0, 0, depth / 2])
+        return cls(q, corner, _vector(end) - _vector(start), (0, 0, depth))
+
+    def _corners(self, points):
+        # Coordinates of the sheet edges relative to the point in the frame (e1, e2, n)
+        relative = points - self.corner
+        x = relative @ self.e1
+        y = relative @ self.e2
+        z = relative @ self.n
+        u = np.stack((-x, self.a - x), axis=-1)[..., :, np.newaxis]
+        v = np.stack((-y, self.b - y), axis=-1)[..., np.newaxis, :]
+        z = z[..., np.newaxis, np.newaxis]
+        # Signs of the corners in the double antiderivative
+        sign = np.array([[1, -1], [-1, 1]])
+        return u, v, z, sign
+
+    def field_3d(self, points):
+        """
+        Closed-form field of the sheet:
+        E_x = k*sigma*[ln(v + R)], E_y = k*sigma*[ln(u + R)], E_z = k*sigma*[atan(u*v / (z*R))]
+        over the four corners (u, v) with R = sqrt(u^2 + v^2 + z^2)
+
+        :return: Field vectors (..., 3)
+        """
+        u, v, z, sign = self._corners(points)
+        R = np.sqrt(u ** 2 + v ** 2 + z ** 2)
+        z_safe = np.where(z == 0, TINY, z)
+        E1 = np.sum(sign * _log_sum(v, R, u ** 2 + z ** 2), axis=(-2, -1))
+        E2 = np.sum(sign * _log_sum(u, R, v ** 2 + z ** 2), axis=(-2, -1))
+        En = np.sum(sign * np.arctan(u * v / (z_safe * np.maximum(R, TINY))), axis=(-2, -1))
+        scale = k * self.density
+        return scale * (E1[..., np.newaxis] * self.e1 + E2[..., np.newaxis] * self.e2 + En[..., np.newaxis] * self.n)
+
+    def potential_3d(self, points):
+        """
+        Closed-form potential of the sheet:
+        V = k*sigma*[u*ln(v + R) + v*ln(u + R) - z*atan(u*v / (z*R))] over the four corners
+        """
+        u, v, z, sign = self._corners(points)
+        R = np.sqrt(u ** 2 + v ** 2 + z ** 2)
+        z_safe = np.where(z == 0, TINY, z)
+        G = u * _log_sum(v, R, u ** 2 + z ** 2) + v * _log_sum(u, R, v ** 2 + z ** 2) \
+            - z * np.arctan(u * v / (z_safe * np.maximum(R, TINY)))
+        return k * self.density * np.sum(sign * G, axis=(-2, -1))
+
+    def field(self, X, Y):
+        E = self.field_3d(_points(X, Y))
+        return E[..., 0], E[..., 1]
+
+    def potential(self, X, Y):
+        return self.potential_3d(_points(X, Y))
+
+    def outline(self):
+        corners = self.corner + np.array([0, self.a, self.a, 0, 0])[:, np.newaxis] * self.e1 \
+            + np.array([0, 0, self.b, self.b, 0])[:, np.newaxis] * self.e2
+        return corners[:, 0], corners[:, 1]
+
+
+def gauss_legendre(start, end, panels, order):
+    """
+    Composite Gauss–Legendre nodes and weights on [start, end]
+
+    :param panels: Number of equal sub-intervals
+    :param order: Number of nodes per sub-interval
+    :return: Nodes and weights, arrays of panels * order values
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    edges = np.linspace(start, end, panels + 1)
+    half = np.diff(edges)[:, np.newaxis] / 2
+    middle = (edges[:-1] + edges[1:])[:, np.newaxis] / 2
+    return (middle + half * nodes).ravel(), (half * weights).ravel()
+
+
+def quadrature_sum(points, sources, charges, chunk=2 ** 20):
+    """
+    Field and potential of point-like source elements, summed in chunks of grid points
+
+    The work array has at most chunk = points x sources elements, so memory stays bounded
+    for any grid size.
+
+    :param points: Evaluation points (..., 3)
+    :param sources: Quadrature nodes (M, 3)
+    :param charges: Charge of every node, weight times density (M,)
+    :return: Field vectors (..., 3) and potential (...)
+    """
+    shape = points.shape[:-1]
+    points = points.reshape(-1, 3)
+    E = np.empty_like(points)
+    V = np.empty(len(points))
+    step = max(1, chunk // len(sources))
+    for start in range(0, len(points), step):
+        block = points[start:start + step]
+        d = [block[:, i:i + 1] - sources[:, i] for i in range(3)]
+        r_squared = np.maximum(d[0] ** 2 + d[1] ** 2 + d[2] ** 2, TINY)
+        weights = k * charges / np.sqrt(r_squared)
+        V[start:start + step] = weights.sum(axis=1)
+        weights /= r_squared
+        for i in range(3):
+            E[start:start + step, i] = np.sum(weights * d[i], axis=1)
+    return E.reshape(shape + (3,)), V.reshape(shape)
+
+
+class ArcCharge:
+    def __init__(self, q, center, radius, start_angle, end_angle, panels=16, order=8):
+        """
+        Initialize a uniformly charged circular arc in the plane of the grid
+
+        The arc has no elementary closed form, so its field is computed by composite
+        Gauss–Legendre quadrature along the arc, batched over the grid points.
+        A panel closer to a point than its own length is bisected for that point until
+        the pieces are farther than their length, so the near field keeps the accuracy
+        of the far field.
+
+        :param q: Total charge in coulombs (C)
+        :param center: Coordinates (x, y) of the arc center
+        :param radius: Arc radius (m)
+        :param start_angle: Start angle in radians (from the positive x-axis)
+        :param end_angle: End angle in radians
+        :param panels: Number of quadrature panels along the arc
+        :param order: Number of Gauss–Legendre nodes per panel
+        """
+        self.q = q
+        self.center = _vector(center)
+        self.radius = radius
+        # Charge per radian; the sign of the angle step cancels in density * d(angle)
+        self.density = q / (end_angle - start_angle)
+        self.edges = np.linspace(start_angle, end_angle, panels + 1)
+        self.nodes, self.weights = np.polynomial.legendre.leggauss(order)
+        angles, weights = gauss_legendre(start_angle, end_angle, panels, order)
+        self.sources = self._arc_points(angles)
+        # Element charge: lambda * R * d(angle)
+        self.charges = self.density * weights
+
+    def _arc_points(self, angles):
+        return self.center + self.radius * np.stack((np.cos(angles), np.sin(angles), np.zeros_like(angles)), axis=-1)
+
+    def _near(self, points, a, b):
+        # Points closer to the middle of the panel [a, b] than its length
+        middle = self._arc_points((a + b) / 2)
+        return np.linalg.norm(points - middle, axis=-1) < self.radius * np.abs(b - a)
+
+    def _panel_sum(self, points, a, b, chunk=2 ** 20):
+        # Field and potential of the panels [a, b] at the points, one panel per point (P, 3)
+        E = np.empty_like(points)
+        V = np.empty(len(points))
+        step = max(1, chunk // len(self.nodes))
+        for start in range(0, len(points), step):
+            half = (b[start:start + step] - a[start:start + step])[:, np.newaxis] / 2
+            middle = (b[start:start + step] + a[start:start + step])[:, np.newaxis] / 2
+            d = points[start:start + step, np.newaxis, :] - self._arc_points(middle + half * self.nodes)
+            r_squared = np.maximum(np.einsum('pni,pni->pn', d, d), TINY)
+            weights = k * self.density * half * self.weights / np.sqrt(r_squared)
+            V[start:start + step] = weights.sum(axis=1)
+            E[start:start + step] = np.einsum('pn,pni->pi', weights / r_squared, d)
+        return E, V
+
+    def _evaluate(self, points, max_bisections=40):
+        """
+        Field and potential at the points (..., 3)
+
+        All panels are summed at once, then for the (point, panel) pairs that are too close
+        the panel term is replaced by the sum over its bisected pieces.
+        """
+        shape = points.shape[:-1]
+        points = points.reshape(-1, 3)
+        E, V = quadrature_sum(points, self.sources, self.charges)
+
+        index, a, b = [], [], []
+        for start, end in zip(self.edges[:-1], self.edges[1:]):
+            near = np.flatnonzero(self._near(points, start, end))
+            index.append(near)
+            a.append(np.full(len(near), start))
+            b.append(np.full(len(near), end))
+        index, a, b = np.concatenate(index), np.concatenate(a), np.concatenate(b)
+        dE, dV = self._panel_sum(points[index], a, b)
+        np.subtract.at(E, index, dE)
+        np.subtract.at(V, index, dV)
+
+        for level in range(max_bisections):
+            if not len(index):
+                break
+            middle = (a + b) / 2
+            index, a, b = np.tile(index, 2), np.concatenate((a, middle)), np.concatenate((middle, b))
+            # Points on the arc itself stay near every piece; the last level is summed as it is
+            near = self._near(points[index], a, b) if level < max_bisections - 1 else np.zeros(len(index), bool)
+            dE, dV = self._panel_sum(points[index[~near]], a[~near], b[~near])
+            np.add.at(E, index[~near], dE)
+            np.add.at(V, index[~near], dV)
+            index, a, b = index[near], a[near], b[near]
+        return E.reshape(shape + (3,)), V.reshape(shape)
+
+    def field_3d(self, points):
+        return self._evaluate(points)[0]
+
+    def potential_3d(self, points):
+        return self._evaluate(points)[1]
+
+    def field(self, X, Y):
+        E = self.field_3d(_points(X, Y))
+        return E[..., 0], E[..., 1]
+
+    def potential(self, X, Y):
+        return self.potential_3d(_points(X, Y))
+
+    def outline(self):
+        return self.sources[:, 0], self.sources[:, 1]
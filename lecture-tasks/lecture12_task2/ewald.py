@@ -0,0 +1,193 @@
+import numpy as np
+from scipy.fft import next_fast_len
+from scipy.special import erfc
+
+# Coulomb's constant
+k = 8.988e9  # Coulomb's constant in N·m²/C²
+
+# Squared distances are clamped to this value on the charge itself
+TINY = 1e-20
+
+# Mesh points per the highest reciprocal-space mode kept; 4 gives ~1e-7 relative error with order-6 B-splines
+MESH_OVERSAMPLING = 4
+
+
+def _bspline_weights(f, order):
+    """
+    Cardinal B-spline weights M_p(f + j), j = 0..order-1, for fractional parts f in [0, 1)
+
+    M_2(u) = 1 - |u - 1| and M_n(u) = (u M_{n-1}(u) + (n - u) M_{n-1}(u - 1)) / (n - 1).
+
+    :return: Array of shape (len(f), order)
+    """
+    weights = np.zeros((len(f), order))
+    weights[:, 0] = f
+    weights[:, 1] = 1 - f
+    for n in range(3, order + 1):
+        previous = weights.copy()
+        for j in range(n):
+            u = f + j
+            weights[:, j] = (u * previous[:, j] if j < n - 1 else 0) + ((n - u) * previous[:, j - 1] if j else 0)
+            weights[:, j] /= n - 1
+    return weights
+
+
+def _bspline_modulus(K, order):
+    # |b(m)|^2 of smooth particle-mesh Ewald for the mesh frequencies m = 0..K-1
+    values = _bspline_weights(np.zeros(1), order)[0, 1:]  # M_p(1) .. M_p(p - 1)
+    m = np.arange(K)
+    denominator = np.exp(2j * np.pi * np.outer(m, np.arange(order - 1)) / K) @ values
+    return 1 / np.abs(denominator) ** 2
+
+
+class EwaldLattice:
+    def __init__(self, positions, charges, a1, a2, accuracy=1e-6, cutoff=None, order=6):
+        """
+        Point charges of a unit cell repeated on an infinite 2D lattice in the plane z = 0
+
+        The 1/r sum over all periodic images is split by Ewald summation: a screened part
+        erfc(alpha r) / r summed over the images within the cutoff, and a smooth part summed in
+        reciprocal space (2D-periodic, 3D Coulomb). Its structure factor comes from charges spread
+        onto a mesh with B-splines of the given order and one FFT (smooth particle-mesh Ewald),
+        so the lattice costs O(N log N) instead of thousands of replicated image cells.
+        The potential of a cell with net charge Q is taken with the reference of the Ewald
+        k = 0 term, -2 sqrt(pi) k Q / (A alpha); its in-plane field does not depend on it.
+
+        :param positions: Charge positions in the cell, (N, 2)
+        :param charges: Charges in coulombs (C), (N,)
+        :param a1: First lattice vector (x, y)
+        :param a2: Second lattice vector (x, y)
+        :param accuracy: Relative size of the neglected real- and reciprocal-space terms
+        :param cutoff: Real-space cutoff radius; by default about a dozen charges fall within it,
+                       at most half the smaller cell width
+        :param order: B-spline order of the charge spreading (even)
+        """
+        self.positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        self.charges = np.asarray(charges, dtype=float).ravel()
+        self.q = self.charges.sum()
+        self.cell = np.array([a1, a2], dtype=float)  # rows are the lattice vectors
+        self.area = abs(np.linalg.det(self.cell))
+        # Reciprocal vectors b_i with a_i . b_j = 2 pi delta_ij (rows)
+        self.reciprocal = 2 * np.pi * np.linalg.inv(self.cell).T
+        # Cell widths perpendicular to the other lattice vector
+        widths = self.area / np.linalg.norm(self.cell[::-1], axis=1)
+
+        if cutoff is None:
+            cutoff = min(0.5 * widths.min(), 2 * np.sqrt(self.area / len(self.charges)))
+        self.cutoff = cutoff
+        scale = np.sqrt(-np.log(accuracy))
+        self.alpha = scale / self.cutoff
+        # Images of the cell that can hold charges within the cutoff of a point in the cell
+        self.images = np.ceil(self.cutoff / widths).astype(int) + 1
+
+        # Mesh: the reciprocal sum is cut at |k| = 2 alpha * scale, sampled with some oversampling
+        k_max = 2 * self.alpha * scale
+        m_max = k_max / np.linalg.norm(self.reciprocal, axis=1)
+        self.mesh = np.array([max(16, next_fast_len(int(np.ceil(MESH_OVERSAMPLING * m)))) for m in m_max])
+        self.order = order
+        self._solve()
+
+    def _fractional(self, points):
+        # Fractional coordinates of points (..., 2) wrapped into [0, 1)
+        return np.mod(points @ np.linalg.inv(self.cell), 1.0)
+
+    def _mesh_weights(self, fractional):
+        # Mesh indices (P, p, p) and B-spline weights (P, p, p) of the points
+        u = fractional * self.mesh
+        base = np.floor(u).astype(int)
+        weights = [_bspline_weights(u[:, i] - base[:, i], self.order) for i in range(2)]
+        offsets = np.arange(self.order)
+        i1 = np.mod(base[:, 0, np.newaxis] - offsets, self.mesh[0])
+        i2 = np.mod(base[:, 1, np.newaxis] - offsets, self.mesh[1])
+        index = i1[:, :, np.newaxis] * self.mesh[1] + i2[:, np.newaxis, :]
+        return index, weights[0][:, :, np.newaxis] * weights[1][:, np.newaxis, :]
+
+    def _solve(self):
+        # Reciprocal-space potential and field on the mesh (smooth particle-mesh Ewald)
+        K1, K2 = self.mesh
+        index, weights = self._mesh_weights(self._fractional(self.positions))
+        Q = np.bincount(index.ravel(), (weights * self.charges[:, np.newaxis, np.newaxis]).ravel(), K1 * K2)
+
+        m1 = np.fft.fftfreq(K1, 1 / K1)
+        m2 = np.fft.fftfreq(K2, 1 / K2)
+        kx = m1[:, np.newaxis] * self.reciprocal[0, 0] + m2[np.newaxis, :] * self.reciprocal[1, 0]
+        ky = m1[:, np.newaxis] * self.reciprocal[0, 1] + m2[np.newaxis, :] * self.reciprocal[1, 1]
+        k_norm = np.hypot(kx, ky)
+        k_norm[0, 0] = 1.0
+        green = 2 * np.pi * erfc(k_norm / (2 * self.alpha)) / k_norm
+        green[0, 0] = 0.0
+        green *= _bspline_modulus(K1, self.order)[:, np.newaxis] * _bspline_modulus(K2, self.order)[np.newaxis, :]
+
+        spectrum = green * np.fft.fft2(Q.reshape(K1, K2)) * (K1 * K2 / self.area)
+        self.mesh_V = np.fft.ifft2(spectrum).real.ravel()
+        # E = -grad(phi): -i k in reciprocal space
+        self.mesh_Ex = np.fft.ifft2(-1j * kx * spectrum).real.ravel()
+        self.mesh_Ey = np.fft.ifft2(-1j * ky * spectrum).real.ravel()
+
+    def _real_space(self, points):
+        # Screened sums over the images of the charges within the cutoff, points wrapped into the cell.
+        # Points are sorted into columns of the cutoff width and by y inside a column, so every image
+        # only visits the points of the (at most three) columns and the y range within its reach.
+        V = np.zeros(len(points))
+        E = np.zeros_like(points)
+        x0 = points[:, 0].min()
+        column = ((points[:, 0] - x0) // self.cutoff).astype(int)
+        order = np.lexsort((points[:, 1], column))
+        column, x, y = column[order], points[order, 0], points[order, 1]
+        bounds = np.searchsorted(column, np.arange(column[-1] + 2))
+
+        n1 = np.arange(-self.images[0], self.images[0] + 1)
+        n2 = np.arange(-self.images[1], self.images[1] + 1)
+        shifts = n1[:, np.newaxis, np.newaxis] * self.cell[0] + n2[np.newaxis, :, np.newaxis] * self.cell[1]
+        wrapped = self._fractional(self.positions) @ self.cell
+        for shift in shifts.reshape(-1, 2):
+            for (xq, yq), q in zip(wrapped + shift, self.charges):
+                first = max(int((xq - self.cutoff - x0) // self.cutoff), 0)
+                last = min(int((xq + self.cutoff - x0) // self.cutoff), column[-1])
+                for c in range(first, last + 1):
+                    start, end = bounds[c], bounds[c + 1]
+                    low, high = np.searchsorted(y[start:end], (yq - self.cutoff, yq + self.cutoff)) + start
+                    if low == high:
+                        continue
+                    dx = x[low:high] - xq
+                    dy = y[low:high] - yq
+                    r_squared = np.maximum(dx ** 2 + dy ** 2, TINY)
+                    r = np.sqrt(r_squared)
+                    screened = erfc(self.alpha * r) / r
+                    V[low:high] += q * screened
+                    radial = q * (screened + 2 * self.alpha / np.sqrt(np.pi) * np.exp(-(self.alpha * r) ** 2)) / r_squared
+                    E[low:high, 0] += radial * dx
+                    E[low:high, 1] += radial * dy
+
+        # Back to the order of the points
+        V[order], E[order] = V.copy(), E.copy()
+        return V, E
+
+    def evaluate(self, X, Y):
+        """
+        Field and potential of the lattice at the points (X, Y) of the plane
+
+        :param X: X coordinates (any shape)
+        :param Y: Y coordinates of the same shape
+        :return: Ex, Ey, V
+        """
+        shape = np.shape(X)
+        points = np.column_stack((np.ravel(X), np.ravel(Y))).astype(float)
+        fractional = self._fractional(points)
+        points = fractional @ self.cell
+
+        V, E = self._real_space(points)
+        index, weights = self._mesh_weights(fractional)
+        V += np.einsum('pij,pij->p', weights, self.mesh_V[index])
+        E[:, 0] += np.einsum('pij,pij->p', weights, self.mesh_Ex[index])
+        E[:, 1] += np.einsum('pij,pij->p', weights, self.mesh_Ey[index])
+        # k = 0 term of the plane z = 0
+        V -= 2 * np.sqrt(np.pi) * self.q / (self.area * self.alpha)
+        return k * E[:, 0].reshape(shape), k * E[:, 1].reshape(shape), k * V.reshape(shape)
+
+    def field(self, X, Y):
+        Ex, Ey, _ = self.evaluate(X, Y)
+        return Ex, Ey
+
+    def potential(self, X, Y):
+        return self.evaluate(X, Y)[2]
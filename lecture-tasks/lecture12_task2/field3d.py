@@ -0,0 +1,196 @@
+import argparse
+import time
+
+import numpy as np
+from scipy.ndimage import map_coordinates
+
+try:
+    from skimage.measure import marching_cubes
+except ImportError:  # isosurfaces need scikit-image
+    marching_cubes = None
+
+# Coulomb's constant
+k = 8.988e9  # Coulomb's constant in N·m²/C²
+
+# Squared distances are clamped to this value on the charge itself
+TINY = 1e-20
+
+
+def _charge_arrays(positions, charges):
+    # Positions as (N, 3): 2D positions are placed in the plane z = 0
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    if positions.shape[1] == 2:
+        positions = np.column_stack((positions, np.zeros(len(positions))))
+    return positions, np.asarray(charges, dtype=float).ravel()
+
+
+def _allocate(shape, dtype, path):
+    # Output array in memory, or a .npy file mapped into memory when a path is given
+    if path is None:
+        return np.empty(shape, dtype=dtype)
+    return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+
+
+def volume(positions, charges, x, y, z, field=False, block=16, dtype=np.float64, paths=None):
+    """
+    Potential (and optionally field) of point charges on a 3D grid
+
+    The grid is processed in slabs of `block` z-planes. Within a slab the squared distance
+    is assembled from per-axis terms, (x - xq)^2 + (y - yq)^2 + (z - zq)^2, so the temporaries
+    stay at the slab size for any number of charges and grid size.
+
+    :param positions: Charge positions, (N, 3) or (N, 2) for charges in the plane z = 0
+    :param charges: Charges in coulombs (C), (N,)
+    :param x: 1D grid coordinates along X
+    :param y: 1D grid coordinates along Y
+    :param z: 1D grid coordinates along Z
+    :param field: Also compute the field components
+    :param block: Number of z-planes per slab
+    :param dtype: Data type of the results
+    :param paths: Optional dict with keys 'V', 'Ex', 'Ey', 'Ez' - .npy files to write the results to
+                  (memory-mapped, so the volume does not need to fit in RAM)
+    :return: V, or (V, Ex, Ey, Ez), arrays of shape (nx, ny, nz)
+    """
+    positions, charges = _charge_arrays(positions, charges)
+    x, y, z = (np.asarray(axis, dtype=float) for axis in (x, y, z))
+    shape = (len(x), len(y), len(z))
+    paths = paths or {}
+    names = ('V', 'Ex', 'Ey', 'Ez') if field else ('V',)
+    outputs = [_allocate(shape, dtype, paths.get(name)) for name in names]
+
+    for start in range(0, len(z), block):
+        zs = z[start:start + block]
+        V = np.zeros((len(x), len(y), len(zs)))
+        buffer = np.empty_like(V)
+        if field:
+            E = [np.zeros_like(V) for _ in range(3)]
+            scratch = np.empty_like(V)
+        for (xq, yq, zq), q in zip(positions, charges):
+            dx = (x - xq)[:, np.newaxis, np.newaxis]
+            dy = (y - yq)[np.newaxis, :, np.newaxis]
+            dz = (zs - zq)[np.newaxis, np.newaxis, :]
+            # Clamping the small (x, y) part keeps r^2 >= TINY without a pass over the slab
+            r_squared = buffer
+            np.add(np.maximum(dx ** 2 + dy ** 2, TINY), dz ** 2, out=r_squared)
+            if field:
+                np.copyto(scratch, r_squared)
+            # k*q/r, accumulated in place
+            np.sqrt(r_squared, out=buffer)
+            np.divide(k * q, buffer, out=buffer)
+            V += buffer
+            if field:
+                # k*q/r^3 times the components of r
+                np.divide(buffer, scratch, out=buffer)
+                for component, d in zip(E, (dx, dy, dz)):
+                    np.multiply(buffer, d, out=scratch)
+                    component += scratch
+        outputs[0][:, :, start:start + block] = V
+        if field:
+            for output, component in zip(outputs[1:], E):
+                output[:, :, start:start + block] = component
+
+    for output in outputs:
+        if isinstance(output, np.memmap):
+            output.flush()
+    return outputs[0] if not field else tuple(outputs)
+
+
+def plane(positions, charges, origin, u, v, nu, nv, chunk=2 ** 18):
+    """
+    Potential and field of point charges on an arbitrary planar slice
+
+    The plane is origin + s * u + t * v for s, t in [0, 1] on an (nv, nu) grid;
+    it is evaluated directly from the charges, not interpolated from a volume.
+
+    :return: Points (nv, nu, 3), potential V (nv, nu) and field E (nv, nu, 3)
+    """
+    positions, charges = _charge_arrays(positions, charges)
+    s = np.linspace(0, 1, nu)
+    t = np.linspace(0, 1, nv)
+    points = (np.asarray(origin, dtype=float) + s[np.newaxis, :, np.newaxis] * np.asarray(u, dtype=float)
+              + t[:, np.newaxis, np.newaxis] * np.asarray(v, dtype=float))
+
+    flat = points.reshape(-1, 3)
+    V = np.zeros(len(flat))
+    E = np.zeros_like(flat)
+    for start in range(0, len(flat), chunk):
+        block = flat[start:start + chunk]
+        for position, q in zip(positions, charges):
+            d = block - position
+            r_squared = np.maximum(np.einsum('ij,ij->i', d, d), TINY)
+            inverse_r = k * q / np.sqrt(r_squared)
+            V[start:start + chunk] += inverse_r
+            E[start:start + chunk] += d * (inverse_r / r_squared)[:, np.newaxis]
+    return points, V.reshape(nv, nu), E.reshape(nv, nu, 3)
+
+
+def volume_slice(values, x, y, z, origin, u, v, nu, nv, order=1):
+    """
+    Arbitrary planar slice of a computed volume (e.g. a memory-mapped .npy file), trilinear by default
+
+    :param values: Volume of shape (nx, ny, nz) on the uniform grid x, y, z
+    :return: Points (nv, nu, 3) and the interpolated values (nv, nu); NaN outside the volume
+    """
+    s = np.linspace(0, 1, nu)
+    t = np.linspace(0, 1, nv)
+    points = (np.asarray(origin, dtype=float) + s[np.newaxis, :, np.newaxis] * np.asarray(u, dtype=float)
+              + t[:, np.newaxis, np.newaxis] * np.asarray(v, dtype=float))
+    # Fractional grid indices along every axis
+    indices = [(points[..., i] - axis[0]) / (axis[1] - axis[0]) for i, axis in enumerate((x, y, z))]
+    sliced = map_coordinates(values, indices, order=order, mode='constant', cval=np.nan)
+    return points, sliced
+
+
+def isosurface(values, x, y, z, level):
+    """
+    Triangulated surface V = level by marching cubes (requires scikit-image)
+
+    :param values: Volume of shape (nx, ny, nz) on the uniform grid x, y, z
+    :param level: Value of V on the surface
+    :return: Vertices (M, 3) in physical coordinates (x, y, z) and triangles (K, 3) as vertex indices
+    """
+    if marching_cubes is None:
+        raise ImportError("Isosurfaces need scikit-image: pip install scikit-image")
+    spacing = tuple(float(axis[1] - axis[0]) for axis in (x, y, z))
+    vertices, faces, _, _ = marching_cubes(np.asarray(values), level=level, spacing=spacing)
+    vertices += np.array([x[0], y[0], z[0]])
+    return vertices, faces
+
+
+def write_obj(path, vertices, faces):
+    """
+    Save a triangulated surface as a Wavefront OBJ file
+    """
+    with open(path, 'w') as file:
+        np.savetxt(file, vertices, fmt='v %.6g %.6g %.6g')
+        np.savetxt(file, faces + 1, fmt='f %d %d %d')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="3D potential of point charges with slices and isosurfaces")
+    parser.add_argument("--size", type=int, default=256, help="grid nodes per axis")
+    parser.add_argument("--charges", type=int, default=64, help="number of random charges in the scene")
+    parser.add_argument("--output", default="field3d", help="prefix of the output files")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-1.5, 1.5, (args.charges, 3))
+    charges = rng.choice([-1e-9, 1e-9], args.charges)
+    axis = np.linspace(-2, 2, args.size)
+
+    start = time.perf_counter()
+    V = volume(positions, charges, axis, axis, axis, paths={'V': f"{args.output}_V.npy"})
+    print(f"{args.size}^3 potential for {args.charges} charges: {time.perf_counter() - start:.2f} s "
+          f"-> {args.output}_V.npy")
+
+    # Diagonal slice through the volume and the equipotential surface V = +-50 V
+    _, sliced = volume_slice(V, axis, axis, axis, (-2, -2, -2), (4, 4, 0), (0, 0, 4), 512, 512)
+    np.save(f"{args.output}_slice.npy", sliced)
+    for level in (-50.0, 50.0):
+        vertices, faces = isosurface(V, axis, axis, axis, level)
+        write_obj(f"{args.output}_iso_{level:+g}.obj", vertices, faces)
+        print(f"Isosurface V = {level:+g} V: {len(faces)} triangles -> {args.output}_iso_{level:+g}.obj")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+from contourpy import contour_generator
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.widgets import Slider
+
+# Coulomb's constant
+k = 8.988e9  # Coulomb's constant in N·m²/C²
+
+# Grid resolutions: the first is drawn at once, the others are computed in the background
+RESOLUTIONS = (50, 100, 200, 400)
+
+# Number of equipotential levels
+LEVELS = 50
+
+# Field line densities of the quick and the final field lines
+DENSITIES = (0.6, 1.2)
+
+# Time without changes (s) before the refinement starts, so it does not slow down a burst of edits
+REFINE_DELAY = 0.15
+
+
+class Cancelled(Exception):
+    pass
+
+
+def field_maps(charges, n, extent, cancelled=lambda: False, dtype=np.float32):
+    """
+    Field and potential of point charges on an n x n grid, in units of k*q_max
+
+    :param charges: List of (q, x, y) tuples, q in coulombs (C)
+    :param n: Number of grid nodes per side
+    :param extent: Domain (xmin, xmax, ymin, ymax)
+    :param cancelled: Callable checked between charges; the computation stops with Cancelled when it returns True
+    :param dtype: Data type of the maps
+    :return: X, Y, Ex, Ey, V and the unit k*q_max
+    """
+    X, Y = np.meshgrid(np.linspace(extent[0], extent[1], n, dtype=dtype),
+                       np.linspace(extent[2], extent[3], n, dtype=dtype))
+    Ex, Ey, V = np.zeros_like(X), np.zeros_like(X), np.zeros_like(X)
+    unit = k * max((abs(q) for q, _, _ in charges), default=1.0 / k)
+    for q, xq, yq in charges:
+        if cancelled():
+            raise Cancelled
+        dx = X - dtype(xq)
+        dy = Y - dtype(yq)
+        r_squared = np.maximum(dx ** 2 + dy ** 2, dtype(1e-20))
+        inverse_r = dtype(q * k / unit) / np.sqrt(r_squared)
+        V += inverse_r
+        inverse_r /= r_squared
+        Ex += inverse_r * dx
+        Ey += inverse_r * dy
+    return X, Y, Ex, Ey, V, unit
+
+
+def equipotentials(X, Y, V, levels=LEVELS):
+    """
+    Equipotential lines as a list of (M, 2) vertex arrays, levels spread evenly between min and max of V
+    """
+    generator = contour_generator(X, Y, V)
+    segments = []
+    for level in np.linspace(V.min(), V.max(), levels)[1:-1]:
+        segments.extend(generator.lines(level))
+    return segments
+
+
+def field_lines(X, Y, Ex, Ey, color, density):
+    """
+    Field line segments and their colour values
+
+    The lines are integrated by streamplot on a figure that is never shown,
+    so this can run outside the GUI thread.
+    """
+    lines = Figure().add_subplot().streamplot(X, Y, Ex, Ey, color=color, density=density).lines
+    return lines.get_segments(), lines.get_array()
+
+
+class ProgressiveScene:
+    def __init__(self, charges, extent=(-2, 2, -2, 2), resolutions=RESOLUTIONS):
+        """
+        Interactive point-charge scene rendered coarse to fine
+
+        A change is shown at once as a log|E| image with equipotentials of the coarsest grid.
+        Once the scene has been unchanged for REFINE_DELAY, finer grids and the field lines are
+        computed by a background thread, and the GUI thread only swaps the finished geometry into
+        the existing artists. A change cancels the refinement of the previous scene between stages.
+        Left click adds a positive charge of the slider magnitude, right click a negative one,
+        a click on an existing charge removes it.
+
+        :param charges: Initial list of (q, x, y) tuples, q in coulombs (C)
+        :param extent: Domain (xmin, xmax, ymin, ymax)
+        :param resolutions: Grid sizes from the preview to the full resolution
+        """
+        self.charges = list(charges)
+        self.extent = extent
+        self.resolutions = resolutions
+
+        # Scenes are numbered; work for an older number is stale
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.results = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+
+        self.fig = plt.figure(figsize=(8, 8.6))
+        self.ax = self.fig.add_axes((0.08, 0.12, 0.88, 0.82))
+        self.image = self.ax.imshow(np.zeros((2, 2)), extent=extent, origin='lower', cmap='inferno', alpha=0.35)
+        self.equipotentials = self.ax.add_collection(
+            LineCollection([], colors='green', linestyles='dashed', linewidths=0.5))
+        self.lines = self.ax.add_collection(LineCollection([], cmap='inferno', linewidths=1))
+        self.markers = self.ax.scatter([], [], s=100, zorder=3)
+        self.ax.set_xlim(extent[:2])
+        self.ax.set_ylim(extent[2:])
+        self.ax.set_aspect('equal')
+        self.ax.grid(True)
+        self.ax.set_xlabel('x')
+        self.ax.set_ylabel('y')
+
+        slider_ax = self.fig.add_axes((0.2, 0.03, 0.6, 0.03))
+        self.slider = Slider(slider_ax, 'q, nC', 0.1, 5.0, valinit=1.0)
+        self.fig.canvas.mpl_connect('button_press_event', self._on_click)
+        self.timer = self.fig.canvas.new_timer(interval=30)
+        self.timer.add_callback(self._poll)
+        self.timer.start()
+        self.update()
+
+    def _cancelled(self, generation):
+        return generation != self.generation
+
+    def _on_click(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        # Click radius of 2% of the domain width around an existing charge
+        radius = 0.02 * (self.extent[1] - self.extent[0])
+        for charge in self.charges:
+            if np.hypot(charge[1] - event.xdata, charge[2] - event.ydata) < radius:
+                self.charges.remove(charge)
+                break
+        else:
+            sign = -1 if event.button == 3 else 1
+            self.charges.append((sign * self.slider.val * 1e-9, event.xdata, event.ydata))
+        self.update()
+
+    def update(self):
+        """
+        Redraw after a change of the charges: preview now, refinement in the background
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+        charges = list(self.charges)
+
+        n = self.resolutions[0]
+        X, Y, Ex, Ey, V, unit = field_maps(charges, n, self.extent)
+        self._show_maps(n, np.hypot(Ex, Ey), unit, equipotentials(X, Y, V))
+        # Field lines of the previous scene are stale
+        self.lines.set_segments([])
+        self.markers.set_offsets(np.array([(x, y) for _, x, y in charges]).reshape(-1, 2))
+        self.markers.set_color(['red' if q > 0 else 'blue' for q, _, _ in charges])
+        self.fig.canvas.draw_idle()
+        self.pending = (charges, generation, time.perf_counter())
+
+    def _refine(self, charges, generation):
+        # Background thread: field lines and finer grids until the scene changes
+        def cancelled():
+            return self._cancelled(generation)
+
+        try:
+            # Finer grids first (milliseconds each), then the field lines, quick and final.
+            # With a single resolution the field lines are traced on the preview grid
+            for n in self.resolutions[1:] or self.resolutions:
+                X, Y, Ex, Ey, V, unit = field_maps(charges, n, self.extent, cancelled)
+                E_magnitude = np.hypot(Ex, Ey)
+                self.results.put((generation, (n, E_magnitude, unit, equipotentials(X, Y, V)), None))
+            color = np.log(np.maximum(E_magnitude, 1e-20)) + np.log(unit)
+            for density in DENSITIES:
+                if cancelled():
+                    return
+                self.results.put((generation, None, field_lines(X, Y, Ex, Ey, color, density)))
+        except Cancelled:
+            pass
+
+    def _poll(self):
+        # GUI thread: start the refinement of a settled scene and show the finished results
+        if self.pending is not None and time.perf_counter() - self.pending[2] > REFINE_DELAY:
+            charges, generation, _ = self.pending
+            self.pending = None
+            if not self._cancelled(generation):
+                self.executor.submit(self._refine, charges, generation)
+
+        changed = False
+        while True:
+            try:
+                generation, maps, lines = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self._cancelled(generation):
+                continue
+            if maps is not None:
+                self._show_maps(*maps)
+            if lines is not None:
+                segments, values = lines
+                self.lines.set_segments(segments)
+                self.lines.set_array(values)
+                # A scene without charges has no field lines
+                if len(values):
+                    self.lines.set_clim(values.min(), values.max())
+            changed = True
+        if changed:
+            self.fig.canvas.draw_idle()
+
+    def _show_maps(self, n, E_magnitude, unit, segments):
+        self.image.set_data(np.log(np.maximum(E_magnitude, 1e-20)) + np.log(unit))
+        self.image.autoscale()
+        self.equipotentials.set_segments(segments)
+        refining = '' if n == self.resolutions[-1] else ' - refining...'
+        self.ax.set_title(f'log|E|, field lines and equipotentials, {n}x{n} grid{refining}')
+
+
+if __name__ == "__main__":
+    # The charges of the lecture; click to add or remove charges
+    scene = ProgressiveScene([
+        (1e-9, 0, 0),
+        (-1e-9, 1, 0),
+        (1e-9, 0, 1),
+        (-1e-9, -1, 0),
+    ])
+    plt.show()
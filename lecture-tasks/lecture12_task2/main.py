@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from ewald import EwaldLattice
+
 # Coulomb's constant
 k = 8.988e9  # Coulomb's constant in N·m²/C²
 
@@ -17,43 +19,109 @@ class PointCharge:
         self.position = np.array(position)
 
 # Function to calculate the electric field from a single charge
-def electric_field(charge, X, Y):
+def electric_field(charge, X, Y, unit=1.0):
     """
     Calculate the electric field from a single point charge
 
     :param charge: PointCharge object
     :param X: Grid of X coordinates
     :param Y: Grid of Y coordinates
+    :param unit: Unit of the result (e.g. k*q_max for float32 grids); the field keeps the dtype of the grid
     :return: Components of the electric field Ex and Ey
     """
-    dx = X - charge.position[0]
-    dy = Y - charge.position[1]
+    dx = X - X.dtype.type(charge.position[0])
+    dy = Y - Y.dtype.type(charge.position[1])
     r_squared = dx**2 + dy**2
-    r = np.sqrt(r_squared)
     # Avoid division by zero
     r_squared[r_squared == 0] = 1e-20
-    Ex = k * charge.q * dx / r_squared**(3/2)
-    Ey = k * charge.q * dy / r_squared**(3/2)
+    factor = X.dtype.type(k * charge.q / unit) / (r_squared * np.sqrt(r_squared))
+    Ex = factor * dx
+    Ey = factor * dy
     return Ex, Ey
 
 # Function to calculate the potential from a single charge
-def potential(charge, X, Y):
+def potential(charge, X, Y, unit=1.0):
     """
     Calculate the electric potential from a single point charge
 
     :param charge: PointCharge object
     :param X: Grid of X coordinates
     :param Y: Grid of Y coordinates
+    :param unit: Unit of the result (e.g. k*q_max for float32 grids); the potential keeps the dtype of the grid
     :return: Potential V
     """
-    dx = X - charge.position[0]
-    dy = Y - charge.position[1]
+    dx = X - X.dtype.type(charge.position[0])
+    dy = Y - Y.dtype.type(charge.position[1])
     r = np.sqrt(dx**2 + dy**2)
     # Avoid division by zero
     r[r == 0] = 1e-20
-    V = k * charge.q / r
+    V = X.dtype.type(k * charge.q / unit) / r
     return V
 
+# Function to calculate the field maps of all charges and distributions
+def field_maps(charges, distributions, x, y, dtype=np.float64, lattice=None):
+    """
+    Calculate the field and potential on a grid in the given precision
+
+    Point charges, lattice and distributions are summed in units of k*q_max over all of them,
+    which keeps float32 maps in range; 1 when every charge is zero.
+
+    :param charges: List of PointCharge objects
+    :param distributions: List of continuous distributions (see distributions.py)
+    :param x: Grid coordinates along X
+    :param y: Grid coordinates along Y
+    :param dtype: np.float64, or np.float32 for half the memory
+    :param lattice: Cell vectors (a1, a2) to repeat the point charges periodically, or None
+    :return: X, Y, Ex, Ey, V (in units of k*q_max) and the unit k*q_max
+    """
+    q_max = max([abs(charge.q) for charge in charges] + [abs(distribution.q) for distribution in distributions],
+                default=0.0)
+    unit = k * q_max if q_max > 0 else 1.0
+    X, Y = np.meshgrid(np.asarray(x, dtype=dtype), np.asarray(y, dtype=dtype))
+
+    Ex_total = np.zeros_like(X)
+    Ey_total = np.zeros_like(Y)
+    V_total = np.zeros_like(X)
+    if lattice is None:
+        for charge in charges:
+            Ex, Ey = electric_field(charge, X, Y, unit)
+            Ex_total += Ex
+            Ey_total += Ey
+            V_total += potential(charge, X, Y, unit)
+    else:
+        # The Ewald sums are evaluated in float64 and converted, like the distributions below
+        periodic = EwaldLattice([charge.position for charge in charges], [charge.q for charge in charges], *lattice)
+        Ex, Ey, V = periodic.evaluate(X, Y)
+        Ex_total += Ex / unit
+        Ey_total += Ey / unit
+        V_total += V / unit
+
+    # Closed-form distributions are evaluated in float64 and converted
+    for distribution in distributions:
+        Ex, Ey = distribution.field(X, Y)
+        Ex_total += Ex / unit
+        Ey_total += Ey / unit
+        V_total += distribution.potential(X, Y) / unit
+    return X, Y, Ex_total, Ey_total, V_total, unit
+
+# Function to compare reduced-precision maps with float64
+def precision_report(maps, charges, distributions, x, y, lattice=None):
+    """
+    Print the relative errors of |E| and V in the given maps against a float64 run of the same scene
+
+    :param maps: Result of field_maps in a reduced precision
+    """
+    reference_maps = field_maps(charges, distributions, x, y, np.float64, lattice)
+    pairs = (maps, reference_maps)
+    for name, (values, reference) in (("|E|", [np.hypot(Ex.astype(np.float64), Ey) * unit
+                                               for _, _, Ex, Ey, _, unit in pairs]),
+                                      ("V", [V.astype(np.float64) * unit for _, _, _, _, V, unit in pairs])):
+        # Where |E| or V passes through zero, the median magnitude is the scale
+        scale = np.maximum(np.abs(reference), np.median(np.abs(reference)))
+        error = np.abs(values - reference) / scale
+        print(f"{maps[2].dtype.name} vs float64, {name}: median relative error {np.median(error):.1e}, "
+              f"max {error.max():.1e}")
+
 # Create a list of point charges
 charges = [
     PointCharge(1e-9, (0, 0)),      # Positive charge at the origin
@@ -62,23 +130,29 @@ charges = [
     PointCharge(-1e-9, (-1, 0))     # Another negative charge
 ]
 
+# Continuous charge distributions (closed-form fields, no point-charge discretisation), e.g.
+# from distributions import ArcCharge, LineCharge, RingCharge, SheetCharge
+# LineCharge(1e-9, (-1, -1.5), (1, -1.5)), RingCharge(1e-9, (0, 0), 0.5),
+# SheetCharge.plate(1e-9, (-1, 1.5), (1, 1.5), depth=2.0), ArcCharge(1e-9, (0, 0), 1.5, 0, np.pi)
+distributions = []
+
+# Periodic mode: the point charges form the unit cell of an infinite lattice with these cell
+# vectors (Ewald summation), e.g. lattice = ((2, 0), (0, 2)); None for the isolated charges
+lattice = None
+
+# Precision of the field maps (np.float32 for half the memory) and whether to check it against float64
+dtype = np.float64
+check_precision = False
+
 # Create a grid of points for visualizing the field
 x = np.linspace(-2, 2, 400)
 y = np.linspace(-2, 2, 400)
-X, Y = np.meshgrid(x, y)
 
-# Initialize components of the electric field and potential
-Ex_total = np.zeros_like(X)
-Ey_total = np.zeros_like(Y)
-V_total = np.zeros_like(X)
-
-# Sum contributions from all charges
-for charge in charges:
-    Ex, Ey = electric_field(charge, X, Y)
-    V = potential(charge, X, Y)
-    Ex_total += Ex
-    Ey_total += Ey
-    V_total += V
+# Components of the electric field and potential from all charges and distributions, in units of k*q_max
+maps = field_maps(charges, distributions, x, y, dtype, lattice)
+X, Y, Ex_total, Ey_total, V_total, unit = maps
+if check_precision and dtype != np.float64:
+    precision_report(maps, charges, distributions, x, y, lattice)
 
 # Normalize the field vectors for visualization of directions
 E_magnitude = np.sqrt(Ex_total**2 + Ey_total**2)
@@ -91,7 +165,7 @@ Ey_norm = Ey_total / E_magnitude
 plt.figure(figsize=(8, 8))
 
 # Visualize electric field lines
-strm = plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude), cmap='inferno', density=1.2, linewidth=1)
+strm = plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude) + np.log(unit), cmap='inferno', density=1.2, linewidth=1)
 
 # Add color bar for the field lines
 plt.colorbar(strm.lines, label='Logarithm of Electric Field Magnitude')
@@ -99,7 +173,7 @@ plt.colorbar(strm.lines, label='Logarithm of Electric Field Magnitude')
 # Visualize equipotential lines
 levels = np.linspace(V_total.min(), V_total.max(), 50)
 contours = plt.contour(X, Y, V_total, levels=levels, colors='green', linestyles='dashed', linewidths=0.5)
-plt.clabel(contours, inline=1, fontsize=8, fmt='%.1e')
+plt.clabel(contours, inline=1, fontsize=8, fmt=lambda level: f'{level * unit:.1e}')
 
 # Display point charges
 for charge in charges:
@@ -110,6 +184,11 @@ for charge in charges:
         plt.scatter(charge.position[0], charge.position[1], color='blue', s=100,
                     label='Negative Charge' if charge == charges[1] else "")
 
+# Display continuous distributions
+for distribution in distributions:
+    xs, ys = distribution.outline()
+    plt.plot(xs, ys, color='red' if distribution.q > 0 else 'blue', linewidth=3)
+
 plt.title('Electrostatic Field and Equipotential Lines of Point Charges')
 plt.xlabel('x')
 plt.ylabel('y')
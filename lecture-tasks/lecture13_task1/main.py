@@ -45,27 +45,70 @@ class Dipole:
         return [positive_charge, negative_charge]
 
 # Function to calculate the electric field from a single charge
-def electric_field(charge, X, Y):
-    dx = X - charge.position[0]
-    dy = Y - charge.position[1]
+def electric_field(charge, X, Y, unit=1.0):
+    # The result is in units of `unit` (e.g. k*q_max for float32 grids) and keeps the dtype of the grid
+    dx = X - X.dtype.type(charge.position[0])
+    dy = Y - Y.dtype.type(charge.position[1])
     r_squared = dx**2 + dy**2
-    r = np.sqrt(r_squared)
     # Avoid division by zero
     r_squared[r_squared == 0] = 1e-20
-    Ex = k * charge.q * dx / r_squared**(3/2)
-    Ey = k * charge.q * dy / r_squared**(3/2)
+    factor = X.dtype.type(k * charge.q / unit) / (r_squared * np.sqrt(r_squared))
+    Ex = factor * dx
+    Ey = factor * dy
     return Ex, Ey
 
 # Function to calculate the potential from a single charge
-def potential(charge, X, Y):
-    dx = X - charge.position[0]
-    dy = Y - charge.position[1]
+def potential(charge, X, Y, unit=1.0):
+    dx = X - X.dtype.type(charge.position[0])
+    dy = Y - Y.dtype.type(charge.position[1])
     r = np.sqrt(dx**2 + dy**2)
     # Avoid division by zero
     r[r == 0] = 1e-20
-    V = k * charge.q / r
+    V = X.dtype.type(k * charge.q / unit) / r
     return V
 
+# Function to calculate the field maps of all charges
+def field_maps(charges, x, y, dtype=np.float64):
+    """
+    Calculate the field and potential on a grid in the given precision
+
+    Maps are in units of k*q_max of the current charges (1 if all are zero); the dipole charges
+    can raise q_max, so the maps are recomputed when they are added.
+
+    :param charges: List of PointCharge objects
+    :param x: Grid coordinates along X
+    :param y: Grid coordinates along Y
+    :param dtype: np.float64, or np.float32 for half the memory
+    :return: X, Y, Ex, Ey, V (in units of k*q_max) and the unit k*q_max
+    """
+    q_max = max((abs(charge.q) for charge in charges), default=0.0)
+    unit = k * q_max if q_max > 0 else 1.0
+    X, Y = np.meshgrid(np.asarray(x, dtype=dtype), np.asarray(y, dtype=dtype))
+    Ex_total = np.zeros_like(X)
+    Ey_total = np.zeros_like(Y)
+    V_total = np.zeros_like(X)
+    for charge in charges:
+        Ex, Ey = electric_field(charge, X, Y, unit)
+        Ex_total += Ex
+        Ey_total += Ey
+        V_total += potential(charge, X, Y, unit)
+    return X, Y, Ex_total, Ey_total, V_total, unit
+
+# Function to compare reduced-precision maps with float64
+def precision_report(maps, charges, x, y):
+    """
+    Print how far the given maps of |E| and V are from float64 ones (relative to the median magnitude
+    where the value crosses zero)
+    """
+    _, _, Ex, Ey, V, unit = maps
+    _, _, Ex_reference, Ey_reference, V_reference, unit_reference = field_maps(charges, x, y)
+    for name, values, reference in (
+            ("|E|", np.hypot(Ex.astype(np.float64), Ey) * unit, np.hypot(Ex_reference, Ey_reference) * unit_reference),
+            ("V", V.astype(np.float64) * unit, V_reference * unit_reference)):
+        error = np.abs(values - reference) / np.maximum(np.abs(reference), np.median(np.abs(reference)))
+        print(f"{Ex.dtype.name} vs float64, {name}: median relative error {np.median(error):.1e}, "
+              f"max {error.max():.1e}")
+
 # Function to calculate the force and torque on a dipole
 def force_and_torque(dipole, Ex, Ey):
     """
@@ -88,30 +131,19 @@ charges = [
     PointCharge(-1e-9, (-1, 0))     # Another negative charge
 ]
 
+# Set dtype = np.float32 to halve the memory of the grids, and check_precision to see what it costs
+dtype = np.float64
+check_precision = False
+
 # Create a grid of points for visualizing the field
 x = np.linspace(-2, 2, 400)
 y = np.linspace(-2, 2, 400)
-X, Y = np.meshgrid(x, y)
-
-# Initialize components of the electric field and potential
-Ex_total = np.zeros_like(X)
-Ey_total = np.zeros_like(Y)
-V_total = np.zeros_like(X)
-
-# Sum contributions from all charges
-for charge in charges:
-    Ex, Ey = electric_field(charge, X, Y)
-    V = potential(charge, X, Y)
-    Ex_total += Ex
-    Ey_total += Ey
-    V_total += V
 
-# Normalize the field vectors for visualization of directions
-E_magnitude = np.sqrt(Ex_total**2 + Ey_total**2)
-# Avoid division by zero
-E_magnitude[E_magnitude == 0] = 1e-20
-Ex_norm = Ex_total / E_magnitude
-Ey_norm = Ey_total / E_magnitude
+# Components of the electric field and potential from all charges, in units of k*q_max
+maps = field_maps(charges, x, y, dtype)
+X, Y, Ex_total, Ey_total, V_total, unit = maps
+if check_precision and dtype != np.float64:
+    precision_report(maps, charges, x, y)
 
 # Get dipole parameters from the user
 dipole_x = float(input("Enter the x-coordinate of the dipole's center: "))
@@ -127,24 +159,25 @@ dipole_charges = dipole.get_charges(separation=0.2)
 # Calculate the force and torque on the dipole at its position
 Ex_dipole = np.interp(dipole.position[0], x, Ex_total[:, np.searchsorted(y, dipole.position[1])])
 Ey_dipole = np.interp(dipole.position[1], y, Ey_total[np.searchsorted(x, dipole.position[0]), :])
+Ex_dipole, Ey_dipole = Ex_dipole * unit, Ey_dipole * unit
 F, torque = force_and_torque(dipole, Ex_dipole, Ey_dipole)
 print(f"Force on the dipole: Fx={F[0]:.3e} N, Fy={F[1]:.3e} N")
 print(f"Torque on the dipole: T={torque:.3e} N·m")
 
-# Add the dipole's charges to the visualization
-for charge in dipole_charges:
-    charges.append(charge)
-    Ex, Ey = electric_field(charge, X, Y)
-    V = potential(charge, X, Y)
-    Ex_total += Ex
-    Ey_total += Ey
-    V_total += V
+# Add the dipole's charges to the visualization; the dipole charges may change k*q_max, so the maps are recomputed
+charges.extend(dipole_charges)
+X, Y, Ex_total, Ey_total, V_total, unit = field_maps(charges, x, y, dtype)
+
+# Normalize the field vectors for visualization of directions
+E_magnitude = np.sqrt(Ex_total**2 + Ey_total**2)
+# Avoid division by zero
+E_magnitude[E_magnitude == 0] = 1e-20
 
 # Plotting
 plt.figure(figsize=(8, 8))
 
 # Visualize electric field lines
-strm = plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude), cmap='inferno', density=1.2, linewidth=1)
+strm = plt.streamplot(X, Y, Ex_total, Ey_total, color=np.log(E_magnitude) + np.log(unit), cmap='inferno', density=1.2, linewidth=1)
 
 # Add color bar for the field lines
 plt.colorbar(strm.lines, label='Logarithm of Electric Field Magnitude')
@@ -152,7 +185,7 @@ plt.colorbar(strm.lines, label='Logarithm of Electric Field Magnitude')
 # Visualize equipotential lines
 levels = np.linspace(V_total.min(), V_total.max(), 50)
 contours = plt.contour(X, Y, V_total, levels=levels, colors='green', linestyles='dashed', linewidths=0.5)
-plt.clabel(contours, inline=1, fontsize=8, fmt='%.1e')
+plt.clabel(contours, inline=1, fontsize=8, fmt=lambda level: f'{level * unit:.1e}')
 
 # Display point charges
 for charge in charges:
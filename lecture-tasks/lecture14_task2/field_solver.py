@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+
+# The multigrid-preconditioned CG solver is shared with the capacitor task
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "lecture15_task2_2"))
+from electrostatics import solve_potential  # noqa: E402
+
+
+def uniform_field_solve(X, Y, eps, E0, theta0_deg, tol=1e-8, multigrid=True, dtype=np.float64):
+    """
+    Field around dielectric objects placed in an applied uniform field.
+    X, Y is a uniform meshgrid and eps the permittivity at its nodes.
+    The applied field E0 points at theta0 (deg) from +y (normal down), like
+    the incident field in solve_refraction_angles; the boundary of the grid
+    keeps the potential of the applied field, phi = -E0 . r.
+    The problem is linear in E0, so it is solved for a unit field and scaled,
+    which keeps float32 values of order one for any E0.
+    Returns: (Ex, Ey, phi, iterations), arrays in the given dtype
+    """
+    t0 = np.radians(theta0_deg)
+    phi_applied = -(np.sin(t0) * X - np.cos(t0) * Y)
+
+    fixed = np.zeros(X.shape, dtype=bool)
+    fixed[0, :] = fixed[-1, :] = fixed[:, 0] = fixed[:, -1] = True
+
+    phi, iterations = solve_potential(eps, fixed, phi_applied, tol=tol, multigrid=multigrid, dtype=dtype)
+
+    # E = -grad(phi); meshgrid arrays are indexed (y, x)
+    dphi_dy, dphi_dx = np.gradient(phi, Y[:, 0].astype(dtype), X[0, :].astype(dtype))
+    scale = dtype(E0)
+    return -scale * dphi_dx, -scale * dphi_dy, scale * phi, iterations
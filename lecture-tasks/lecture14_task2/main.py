@@ -1,99 +1,203 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from field_solver import uniform_field_solve
+
 
 def solve_refraction_angles(eps1, eps2, E1, theta1_deg):
     """
     Solve the boundary conditions for refraction of the E-field
     between two dielectrics with permittivities eps1, eps2.
     Incident field E1 at angle theta1 (deg) from +y (normal down).
-    Returns: (E2, theta2_deg)
+    All arguments may be arrays and are broadcast against each other.
+    Entries with a non-positive or non-finite permittivity give NaN.
+    Returns: (E2, theta2_deg) - floats for scalar input, arrays otherwise
     """
+    eps1, eps2, E1, theta1_deg = np.broadcast_arrays(
+        np.asarray(eps1, dtype=float), np.asarray(eps2, dtype=float),
+        np.asarray(E1, dtype=float), np.asarray(theta1_deg, dtype=float))
     theta1 = np.radians(theta1_deg)
 
     # Equations:
-    # (1) E1 * sin(theta1) = E2 * sin(theta2)
-    # (2) eps1 * E1 * cos(theta1) = eps2 * E2 * cos(theta2)
+    # (1) E1 * sin(theta1) = E2 * sin(theta2)          (tangential E)
+    # (2) eps1 * E1 * cos(theta1) = eps2 * E2 * cos(theta2)   (normal D)
     #
-    # From (1) => E2 = E1 * sin(theta1)/sin(theta2).
-    # Insert into (2):
-    #   eps1 * E1 * cos(theta1) = eps2 * [E1*sin(theta1)/sin(theta2)] * cos(theta2)
-    # => eps1*cos(theta1) = eps2*sin(theta1)*[cos(theta2)/sin(theta2)]
-    # => eps1*cos(theta1) = eps2*sin(theta1)*cot(theta2)
-    # => cot(theta2) = (eps1*cos(theta1)) / (eps2*sin(theta1))
-    # => theta2 = arctan( (eps2*sin(theta1)) / (eps1*cos(theta1)) )
-
-    # Watch for edge cases (theta1=0, etc.), but let's keep it general:
-    theta2 = np.arctan((eps2 * np.sin(theta1)) / (eps1 * np.cos(theta1)))
-    theta2_deg = np.degrees(theta2)
-
-    # E2 from eqn (1):
-    sin_t1 = np.sin(theta1)
-    sin_t2 = np.sin(theta2)
-    if abs(sin_t2) < 1e-14:
-        E2 = 0.0
+    # Solve for the components of E2 instead of dividing by sin(theta2):
+    #   E2t = E1 * sin(theta1),  E2n = E1 * (eps1/eps2) * cos(theta1)
+    # => theta2 = atan2(sin(theta1), (eps1/eps2) * cos(theta1))
+    # => E2 = E1 * hypot(sin(theta1), (eps1/eps2) * cos(theta1))
+    # This needs no special cases: normal incidence gives theta2 = 0 and
+    # E2 = E1 * eps1/eps2, grazing incidence gives theta2 = 90 and E2 = E1.
+
+    # Mask out invalid media so they do not produce warnings
+    valid = np.isfinite(eps1) & np.isfinite(eps2) & (eps1 > 0) & (eps2 > 0)
+    ratio = np.divide(eps1, eps2, out=np.full(eps1.shape, np.nan), where=valid)
+
+    tangential = np.sin(theta1)
+    normal = ratio * np.cos(theta1)
+    theta2_deg = np.degrees(np.arctan2(tangential, normal))
+    E2 = E1 * np.hypot(tangential, normal)
+
+    if E2.ndim == 0:
+        return float(E2), float(theta2_deg)
+    return E2, theta2_deg
+
+
+def refraction_table(eps_layers, theta1_deg, E1=1.0):
+    """
+    Lookup table of the field in every layer of a stack of flat dielectric layers
+    for an array of incidence angles.
+    eps_layers[0] is the top medium with the incident field E1 at theta1 (deg).
+    The tangential E and the normal D are the same across every interface,
+    so each layer follows from the top one directly and the whole table
+    is one broadcast call of solve_refraction_angles (angles x layers).
+    Returns: (E, theta_deg) arrays of shape theta1_deg.shape + (len(eps_layers),)
+    """
+    eps_layers = np.asarray(eps_layers, dtype=float)
+    theta1_deg = np.asarray(theta1_deg, dtype=float)[..., np.newaxis]
+    E, theta_deg = solve_refraction_angles(eps_layers[0], eps_layers, E1, theta1_deg)
+    return np.asarray(E), np.asarray(theta_deg)
+
+
+def layer_fields(eps_layers, E1, theta1_deg):
+    """
+    Field in every layer of a stack for one incident field (one row of refraction_table).
+    Returns: (E, theta_deg) arrays, one value per layer
+    """
+    E, theta_deg = refraction_table(eps_layers, theta1_deg, E1)
+    return E, theta_deg
+
+
+def layered_field(y, interfaces, E_layers, theta_layers_deg):
+    """
+    Return the (Ex, Ey) arrays at heights y (any shape) for a layered stack.
+    interfaces are the y positions of the interfaces from top to bottom;
+    a point at y belongs to layer k when it lies below k interfaces
+    (for one interface at y=0 this is y>0 -> layer 0, otherwise layer 1).
+    The field is constant within a layer, so the evaluation is a lookup.
+    """
+    t = np.radians(theta_layers_deg)
+    Ex_layers = E_layers * np.sin(t)
+    Ey_layers = -E_layers * np.cos(t)
+
+    # Number of interfaces at or above each point
+    ascending = np.sort(np.asarray(interfaces, dtype=float))
+    layer = len(ascending) - np.searchsorted(ascending, y, side='left')
+    return Ex_layers[layer], Ey_layers[layer]
+
+
+def object_main():
+    # Numerical field around a dielectric object in an applied uniform field
+    shape = input("Enter object shape (circle/rectangle): ").strip().lower()
+    if shape not in ("circle", "rectangle"):
+        print("Unknown shape, use 'circle' or 'rectangle'.")
+        return
+    eps_out = float(input("Enter permittivity outside the object: "))
+    eps_in = float(input("Enter permittivity of the object: "))
+    if shape == "circle":
+        radius = float(input("Enter circle radius: "))
+    else:
+        width = float(input("Enter rectangle width: "))
+        height = float(input("Enter rectangle height: "))
+    E0 = float(input("Enter the applied field magnitude E0: "))
+    theta0_deg = float(input("Enter applied field angle THETA0 (deg) w.r.t. +y-axis (normal down): "))
+    n = int(input("Enter grid resolution (nodes per side, e.g. 1000): ") or 1000)
+    precision = input("Enter precision (float64/float32, float32 halves memory): ").strip().lower() or "float64"
+    dtype = np.float32 if precision == "float32" else np.float64
+
+    # The domain is large compared with the object so the boundary barely disturbs it
+    size = 2 * radius if shape == "circle" else max(width, height)
+    half = 4.0 * size
+    vals = np.linspace(-half, half, n)
+    X, Y = np.meshgrid(vals, vals)
+    if shape == "circle":
+        inside = X ** 2 + Y ** 2 <= radius ** 2
     else:
-        E2 = E1 * (sin_t1 / sin_t2)
+        inside = (np.abs(X) <= width / 2) & (np.abs(Y) <= height / 2)
+    eps = np.where(inside, eps_in, eps_out)
+
+    Ex, Ey, phi, iterations = uniform_field_solve(X, Y, eps, E0, theta0_deg, dtype=dtype)
+    E_mag = np.hypot(Ex, Ey)
+
+    print(f"\nResults ({n}x{n} grid, {iterations} CG iterations):")
+    print(f"  Field at the centre of the object: Ex = {Ex[n // 2, n // 2]:.4f}, Ey = {Ey[n // 2, n // 2]:.4f}")
+    if shape == "circle":
+        # Dielectric cylinder in a uniform field: uniform interior field 2*eps_out/(eps_in+eps_out)*E0
+        print(f"  Analytic interior field (unbounded domain): {2 * eps_out / (eps_in + eps_out) * E0:.4f}")
+    if dtype != np.float64:
+        # Accuracy of the reduced precision against a float64 solve; near zeros of |E| the error
+        # is taken relative to the median magnitude
+        Ex_ref, Ey_ref, _, _ = uniform_field_solve(X, Y, eps, E0, theta0_deg)
+        E_ref = np.hypot(Ex_ref, Ey_ref)
+        error = np.abs(E_mag - E_ref) / np.maximum(E_ref, np.median(E_ref))
+        print(f"  {precision} vs float64, |E|: median relative error {np.median(error):.1e}, max {error.max():.1e}")
+
+    # Streamlines on a coarser grid, |E| at full resolution
+    step = max(1, n // 200)
+    fig, ax = plt.subplots(figsize=(7, 7))
+    image = ax.imshow(E_mag, extent=(-half, half, -half, half), origin='lower', cmap='viridis')
+    ax.streamplot(X[::step, ::step], Y[::step, ::step], Ex[::step, ::step], Ey[::step, ::step],
+                  density=1.2, linewidth=1, arrowsize=1, color='w')
+    cb = fig.colorbar(image, ax=ax, orientation='vertical')
+    cb.set_label('Field magnitude |E|')
+    ax.contour(X, Y, inside.astype(float), levels=[0.5], colors='k', linewidths=2)
 
-    return E2, theta2_deg
+    ax.set_xlim([-half, half])
+    ax.set_ylim([-half, half])
+    ax.set_aspect('equal', 'box')
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_title(f"E-field around a dielectric {shape}\n"
+                 f"eps_out={eps_out}, eps_in={eps_in}, theta0={theta0_deg:.1f}°")
+    plt.tight_layout()
+    plt.show()
 
 
 def main():
     print("=== Dielectric Interface: Streamplot Visualization ===")
+    mode = input("Mode: flat layers (closed form) or dielectric object (numerical)? (layers/object): ").strip().lower()
+    if mode == "object":
+        object_main()
+        return
+
     eps1 = float(input("Enter permittivity eps1 (medium 1): "))
     eps2 = float(input("Enter permittivity eps2 (medium 2): "))
 
+    # Optional further layers below medium 2, each with its own thickness
+    eps_layers = [eps1, eps2]
+    interfaces = [0.0]
+    n_extra = int(input("Enter number of additional layers below medium 2 (0 for none): ") or 0)
+    for k in range(n_extra):
+        thickness = float(input(f"Enter thickness of medium {k + 2}: "))
+        interfaces.append(interfaces[-1] - thickness)
+        eps_layers.append(float(input(f"Enter permittivity eps{k + 3} (medium {k + 3}): ")))
+
     # We'll plot E-field lines
     E1 = float(input("Enter the E1 magnitude in medium 1: "))
     theta1_deg = float(
         input("Enter incidence angle THETA1 (deg) w.r.t. +y-axis (normal down): ")
     )
 
-    # Solve for E2, theta2
-    E2, theta2_deg = solve_refraction_angles(eps1, eps2, E1, theta1_deg)
+    # Solve for the field in every layer at once
+    E_layers, theta_layers_deg = layer_fields(eps_layers, E1, theta1_deg)
 
     print(f"\nResults:")
-    print(f"  In medium 1: E1 = {E1:.3f}, theta1 = {theta1_deg:.1f} deg")
-    print(f"  In medium 2: E2 = {E2:.3f}, theta2 = {theta2_deg:.1f} deg")
-
-    # Convert angles to radians
-    t1 = np.radians(theta1_deg)
-    t2 = np.radians(theta2_deg)
-
-    # Define the piecewise E-field function over x,y space
-    def E_field(x, y):
-        """
-        Return the (Ex, Ey) vector at position (x,y).
-        We assume a piecewise constant field:
-          - Medium 1 (y>0): E1 in direction (sin(t1), -cos(t1))
-          - Medium 2 (y<0): E2 in direction (sin(t2), -cos(t2))
-        """
-        if y > 0:
-            # medium 1
-            Ex = E1 * np.sin(t1)
-            Ey = -E1 * np.cos(t1)
-        else:
-            # medium 2
-            Ex = E2 * np.sin(t2)
-            Ey = -E2 * np.cos(t2)
-        return Ex, Ey
+    for k, (E_k, theta_k) in enumerate(zip(E_layers, theta_layers_deg)):
+        print(f"  In medium {k + 1}: E{k + 1} = {E_k:.3f}, theta{k + 1} = {theta_k:.1f} deg")
 
     # Create a grid for streamplot
     x_min, x_max = -2.0, 2.0
-    y_min, y_max = -2.0, 2.0
+    y_min, y_max = min(-2.0, interfaces[-1] - 1.0), 2.0
 
     nx, ny = 200, 200  # resolution
     x_vals = np.linspace(x_min, x_max, nx)
     y_vals = np.linspace(y_min, y_max, ny)
     X, Y = np.meshgrid(x_vals, y_vals)
 
-    # Compute E everywhere
-    Ex = np.zeros_like(X)
-    Ey = np.zeros_like(Y)
-
-    for i in range(ny):
-        for j in range(nx):
-            Ex[i, j], Ey[i, j] = E_field(X[i, j], Y[i, j])
+    # The field depends only on y: evaluate one column and broadcast it over x
+    Ex_col, Ey_col = layered_field(y_vals[:, np.newaxis], interfaces, E_layers, theta_layers_deg)
+    Ex = np.broadcast_to(Ex_col, X.shape)
+    Ey = np.broadcast_to(Ey_col, Y.shape)
 
     # Plot
     fig, ax = plt.subplots(figsize=(7, 7))
@@ -108,9 +212,10 @@ def main():
     cb = fig.colorbar(strm.lines, ax=ax, orientation='vertical')
     cb.set_label('Field magnitude |E|')
 
-    # Draw the interface y=0
-    ax.axhline(0, color='k', linewidth=2)
-    ax.text(-1.9, 0.05, 'Interface (y=0)', fontsize=10, ha='left')
+    # Draw the interfaces
+    for y_interface in interfaces:
+        ax.axhline(y_interface, color='k', linewidth=2)
+        ax.text(-1.9, y_interface + 0.05, f'Interface (y={y_interface:g})', fontsize=10, ha='left')
 
     ax.set_xlim([x_min, x_max])
     ax.set_ylim([y_min, y_max])
@@ -119,7 +224,8 @@ def main():
     ax.set_ylabel('y')
     ax.set_title(
         f"E-field refraction\n"
-        f"eps1={eps1}, eps2={eps2}, theta1={theta1_deg:.1f}°, theta2={theta2_deg:.1f}°"
+        f"eps={', '.join(f'{eps:g}' for eps in eps_layers)}, "
+        f"theta={', '.join(f'{theta:.1f}°' for theta in theta_layers_deg)}"
     )
     plt.tight_layout()
     plt.show()
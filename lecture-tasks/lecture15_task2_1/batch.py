@@ -0,0 +1,141 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import mna
+import netlist
+import preprocess
+
+
+def solve_circuit(circuit):
+    # Решение одной схемы; ошибки возвращаются вместе с результатом.
+    # Возвращаются только массивы решения — описание схемы остаётся в основном процессе
+    try:
+        potentials, branch_currents, floating = preprocess.solve(circuit)
+        return potentials, branch_currents, floating, None
+    except mna.CircuitError as error:
+        return None, None, None, str(error)
+
+
+def parse_error(item):
+    # Результат схемы, которую не удалось разобрать, в том же виде, что у solve_circuit
+    return None if item.error is None else (None, None, None, item.error)
+
+
+def solve_chunk(circuits):
+    # Задача рабочего процесса: несколько схем подряд
+    return [solve_circuit(circuit) for circuit in circuits]
+
+
+def read_file(path):
+    # Схемы файла как (файл, номер схемы в файле, Netlist). Ошибки разбора остаются в своей схеме,
+    # а файл, который не удалось прочитать, даёт одну схему с ошибкой
+    index = 0
+    try:
+        for item in netlist.read(path, recover=True):
+            yield path, index, item
+            index += 1
+    except (OSError, UnicodeDecodeError) as error:
+        yield path, index, netlist.Netlist(path, [], [], None, f"Не удалось прочитать файл: {error}")
+
+
+def read_all(paths):
+    # Схемы из всех файлов подряд, без загрузки файлов целиком
+    return itertools.chain.from_iterable(read_file(path) for path in paths)
+
+
+def solve_all(items, jobs, chunksize):
+    """
+    Решает схемы items (кортежи из read_all) и выдаёт (файл, номер, Netlist, результат) в исходном порядке.
+
+    При jobs > 1 схемы отправляются процессам пачками по chunksize, и в работе одновременно
+    не больше jobs пачек: чтение нетлистов не уходит вперёд записи результатов.
+    """
+    if jobs <= 1:
+        for path, index, item in items:
+            yield path, index, item, parse_error(item) or solve_circuit(item.circuit)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        chunks = iter(lambda: list(itertools.islice(items, chunksize)), [])
+        for chunk in itertools.chain(chunks, [None]):
+            # Последняя «пачка» None только дожидается оставшихся
+            while pending and (chunk is None or len(pending) >= jobs):
+                done, future = pending.popleft()
+                results = iter(future.result())
+                for path, index, item in done:
+                    yield path, index, item, parse_error(item) or next(results)
+            if chunk is not None:
+                circuits = [item.circuit for _, _, item in chunk if item.error is None]
+                pending.append((chunk, executor.submit(solve_chunk, circuits)))
+
+
+def write_csv(path, results):
+    # Одна строка на ветвь: напряжение V_s - V_e и ток из start_node в end_node
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file', 'index', 'circuit', 'element', 'start_node', 'end_node', 'value',
+                         'voltage', 'current', 'error'])
+        for source, index, item, (potentials, branch_currents, floating, error) in results:
+            circuit = item.circuit
+            if error is not None:
+                writer.writerow([source, index, item.title, '', '', '', '', '', '', error])
+                continue
+            voltages = potentials[circuit.start] - potentials[circuit.end]
+            for i, name in enumerate(item.names):
+                writer.writerow([source, index, item.title, name, item.node_names[circuit.start[i]],
+                                 item.node_names[circuit.end[i]], circuit.value[i],
+                                 float(voltages[i]), float(branch_currents[i]), ''])
+
+
+def write_json(path, results):
+    # Словарь по схемам с ключом «файл:номер схемы в файле» (названия схем могут совпадать):
+    # узловые потенциалы и токи по именам узлов и элементов,
+    # floating — узлы, не связанные с опорным (их потенциалы отсчитываются внутри своей части схемы)
+    output = {}
+    for source, index, item, (potentials, branch_currents, floating, error) in results:
+        if error is not None:
+            output[f"{source}:{index}"] = {'title': item.title, 'error': error}
+        else:
+            output[f"{source}:{index}"] = {
+                'title': item.title,
+                'potentials': dict(zip(item.node_names, potentials.tolist())),
+                'currents': dict(zip(item.names, branch_currents.tolist())),
+                'floating': [item.node_names[node] for node in floating.nonzero()[0]],
+            }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(output, file, ensure_ascii=False, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный расчёт схем из нетлистов (формат описан в netlist.py).")
+    parser.add_argument('netlists', nargs='+', help="файлы нетлистов")
+    parser.add_argument('-o', '--output', default='results.csv', help="файл результатов (.csv или .json)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help="количество процессов")
+    parser.add_argument('--chunksize', type=int, default=64, help="схем на одну задачу процесса")
+    args = parser.parse_args()
+    if args.chunksize < 1:
+        parser.error("--chunksize должен быть не меньше 1")
+
+    write = write_json if args.output.lower().endswith('.json') else write_csv
+
+    # Результаты пишутся во временный файл, который заменяет выходной только целиком
+    partial = args.output + '.partial'
+    try:
+        write(partial, solve_all(read_all(args.netlists), args.jobs, args.chunksize))
+        os.replace(partial, args.output)
+    except OSError as error:
+        print(f"Ошибка: {error}")
+        raise SystemExit(1)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+if __name__ == "__main__":
+    main()
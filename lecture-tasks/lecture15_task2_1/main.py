@@ -1,14 +1,13 @@
+import numpy as np
 import sympy
 
+import mna
+import preprocess
 
-def main():
-    print("Эта программа рассчитывает узловые потенциалы и токи в схеме, состоящей из резисторов и источников ЭДС.")
-    print("Для упрощения принимается, что узел 0 является опорным (его потенциал = 0 В).")
-    print("======================================\n")
 
-    # Считываем количество узлов и ветвей
-    n = int(input("Введите количество узлов (включая узел 0): "))
-    m = int(input("Введите количество ветвей: "))
+def solve_symbolic(n, branches):
+    # Точный расчёт: символьные уравнения KCL решаются через sympy.solve.
+    # Возвращает списки узловых потенциалов (V[0] = 0) и токов в ветвях либо None, если решения нет.
 
     # Переменные узловых потенциалов (кроме нулевого узла)
     # Если всего n узлов, индексы узлов 0..(n-1),
@@ -21,25 +20,6 @@ def main():
 
     equations = []
 
-    # Храним все ветви в списке для последующего вычисления токов
-    branches = []
-
-    print("\nВведите описание каждой ветви в формате:")
-    print("start_node end_node type value")
-    print(" - start_node, end_node: номера узлов (целые)")
-    print(" - type: R или E (резистор или ЭДС)")
-    print(" - value: число (сопротивление в Ом или ЭДС в Вольтах)")
-    print("Пример: 0 1 R 10\n")
-
-    for _ in range(m):
-        line = input(f"Ветвь {_ + 1}: ").strip().split()
-        start_node = int(line[0])
-        end_node = int(line[1])
-        elem_type = line[2].upper()
-        value = float(line[3])
-
-        branches.append((start_node, end_node, elem_type, value))
-
     # Для KCL нам нужно накапливать токи в узлы (кроме 0).
     # Создадим словарь, где ключ = номер узла, а значение = выражение (sympy) суммы токов (пока 0).
     current_balance = {node: 0 for node in range(1, n)}  # узел 0 не пишем
@@ -75,11 +55,12 @@ def main():
             if end_node != 0:
                 current_balance[end_node] -= I
 
-        elif elem_type == 'E':
+        elif elem_type in ('E', 'L'):
             # Идеальный источник ЭДС фиксирует (v_s - v_e) = E (или = +val).
             # По условию: потенциал start_node минус потенциал end_node = val.
             # Это дополнительное уравнение.
-            source_equations.append(v_s - v_e - val)
+            # Катушка на постоянном токе — перемычка, т.е. источник с нулевой ЭДС.
+            source_equations.append(v_s - v_e - (val if elem_type == 'E' else 0))
 
             # Ток через идеальный источник не задаётся напрямую (теоретически неограничен).
             # Однако в реальных схемах мы бы могли добавить внутреннее сопротивление.
@@ -123,43 +104,126 @@ def main():
     solutions = sympy.solve(equations, all_symbols, dict=True)
 
     if not solutions:
-        print("\nСистема не имеет решения или переопределена. Проверьте входные данные.")
-        return
+        return None
 
     # Предположим, что решение единственное:
     sol = solutions[0]
 
-    # Выводим найденные узловые потенциалы V1..V_{n-1}
-    print("\nРЕЗУЛЬТАТЫ РАСЧЁТА:")
-    print("Узловые потенциалы (В):")
-    for node_idx in range(1, n):
-        v_sym = V[node_idx - 1]  # это символ V1..V_{n-1}
-        value_sol = sol.get(v_sym, 0)
-        print(f"  V({node_idx}) = {value_sol} В")
-
-    # Теперь найдём токи в каждой ветви.
-    # Нам нужно восстановить формулу тока для резисторов и посмотреть, чему равен I_источника для ЭДС.
-    print("\nТоки в ветвях (А):")
+    # Узловые потенциалы V1..V_{n-1} (узел 0 — опорный)
+    potentials = [0] + [sol.get(V[node_idx - 1], 0) for node_idx in range(1, n)]
 
     # Для вычисления тока в резисторе: I = (V_s - V_e)/R
     # (учитываем положительное направление "из start_node в end_node")
     # Для источника: I = найденное значение I_E_start_end из решения sol
-    for idx, (start_node, end_node, elem_type, val) in enumerate(branches, 1):
+    branch_currents = []
+    for (start_node, end_node, elem_type, val) in branches:
         v_s = V_node(start_node)
         v_e = V_node(end_node)
 
         if elem_type == 'R':
             # Подставляем решения узловых потенциалов
-            I_expr = (v_s - v_e) / val
+            I_expr = sympy.sympify((v_s - v_e) / val)
             # Заменяем V1..V_{n-1} в I_expr найденными числами
             I_val = I_expr.subs(sol)
-            print(f"  Ветвь {idx}: R={val} Ом  (из узла {start_node} в узел {end_node})  I = {I_val.evalf()} А")
+        elif elem_type == 'C':
+            # Конденсатор на постоянном токе — разрыв цепи
+            I_val = sympy.Integer(0)
         else:
             # По соглашению, разность потенциалов v_s - v_e = val (ЭДС).
             # Ток через источник мы ввели как I_E_{start_node}_{end_node}, смотрим в sol
             I_symbol = sympy.Symbol(f'I_E_{start_node}_{end_node}', real=True)
-            I_val = sol.get(I_symbol, 0)
-            print(f"  Ветвь {idx}: E={val} В   (из узла {start_node} в узел {end_node})  I = {I_val.evalf()} А")
+            I_val = sympy.sympify(sol.get(I_symbol, 0))
+        branch_currents.append(I_val.evalf())
+
+    return potentials, branch_currents
+
+
+def print_results(n, branches, potentials, branch_currents):
+    # Выводим найденные узловые потенциалы V1..V_{n-1}
+    print("\nРЕЗУЛЬТАТЫ РАСЧЁТА:")
+    print("Узловые потенциалы (В):")
+    for node_idx in range(1, n):
+        print(f"  V({node_idx}) = {potentials[node_idx]} В")
+
+    # Токи в каждой ветви (положительное направление — из start_node в end_node)
+    print("\nТоки в ветвях (А):")
+    for idx, (start_node, end_node, elem_type, val) in enumerate(branches, 1):
+        I_val = branch_currents[idx - 1]
+        unit = {'R': 'Ом', 'E': 'В', 'C': 'Ф', 'L': 'Гн'}[elem_type]
+        print(f"  Ветвь {idx}: {elem_type}={val} {unit}  (из узла {start_node} в узел {end_node})  I = {I_val} А")
+
+
+def print_transient(n, branches, step, steps, rows=10):
+    # Переходный процесс с разряженными конденсаторами и катушками без тока в момент 0:
+    # узловые потенциалы примерно в rows равноотстоящих моментах времени
+    try:
+        times, potentials, _ = mna.transient(mna.Circuit.from_branches(n, branches), step, steps)
+    except mna.CircuitError as error:
+        print(f"\n{error}")
+        return
+
+    print("\nПереходный процесс (метод трапеций), узловые потенциалы (В):")
+    print("  t, с        " + "".join(f"{f'V({node_idx})':>12}" for node_idx in range(1, n)))
+    for index in np.unique(np.linspace(0, steps, rows + 1).astype(int)):
+        print(f"  {times[index]:<12.4g}" + "".join(f"{value:12.5g}" for value in potentials[index, 1:]))
+
+
+def main():
+    print("Эта программа рассчитывает узловые потенциалы и токи в схеме, состоящей из резисторов и источников ЭДС.")
+    print("Для упрощения принимается, что узел 0 является опорным (его потенциал = 0 В).")
+    print("======================================\n")
+
+    # Считываем количество узлов и ветвей
+    n = int(input("Введите количество узлов (включая узел 0): "))
+    m = int(input("Введите количество ветвей: "))
+
+    # Храним все ветви в списке для последующего вычисления токов
+    branches = []
+
+    print("\nВведите описание каждой ветви в формате:")
+    print("start_node end_node type value")
+    print(" - start_node, end_node: номера узлов (целые)")
+    print(" - type: R, E, C или L (резистор, ЭДС, конденсатор или катушка)")
+    print(" - value: число (сопротивление в Ом, ЭДС в Вольтах, ёмкость в Фарадах или индуктивность в Генри)")
+    print("Расчёт ведётся для постоянного тока: конденсатор — разрыв цепи, катушка — перемычка.")
+    print("Пример: 0 1 R 10\n")
+
+    for _ in range(m):
+        line = input(f"Ветвь {_ + 1}: ").strip().split()
+        start_node = int(line[0])
+        end_node = int(line[1])
+        elem_type = line[2].upper()
+        value = float(line[3])
+
+        branches.append((start_node, end_node, elem_type, value))
+
+    # По умолчанию схема решается численно (разреженная MNA), точный режим — через sympy
+    exact_input = input("Выполнить точный символьный расчёт (sympy)? (да/нет): ").strip().lower()
+
+    if exact_input == "да":
+        result = solve_symbolic(n, branches)
+        if result is None:
+            print("\nСистема не имеет решения или переопределена. Проверьте входные данные.")
+            return
+        potentials, branch_currents = result
+    else:
+        try:
+            potentials, branch_currents, floating = preprocess.solve(mna.Circuit.from_branches(n, branches))
+        except mna.CircuitError as error:
+            print(f"\n{error}")
+            return
+
+        if floating.any():
+            print("\nВнимание: узлы " + ", ".join(map(str, floating.nonzero()[0])) + " не связаны с узлом 0,")
+            print("их потенциалы отсчитываются от узла с наименьшим номером в своей части схемы.")
+
+    print_results(n, branches, potentials, branch_currents)
+
+    # Для схем с конденсаторами и катушками можно рассчитать и переходный процесс
+    if any(elem_type in ('C', 'L') for _, _, elem_type, _ in branches):
+        answer = input("\nШаг (с) и количество шагов переходного процесса (пусто — не считать): ").split()
+        if answer:
+            print_transient(n, branches, float(answer[0]), int(answer[1]))
 
     print("\nРасчёт окончен.")
 
@@ -0,0 +1,407 @@
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+
+class CircuitError(Exception):
+    pass
+
+
+# Типы ветвей: резистор, источник ЭДС, конденсатор, катушка индуктивности
+KINDS = ('R', 'E', 'C', 'L')
+
+# Относительная величина ведущего элемента LU, ниже которой матрица считается вырожденной:
+# у части схемы без связи с узлом 0 остаётся ошибка округления ~1e-16 от наибольшего,
+# а сопротивления в пределах 12 порядков дают не меньше ~1e-11
+SINGULAR_PIVOT = 1e3 * np.finfo(float).eps
+
+
+class Circuit:
+    def __init__(self, n, start, end, kind, value):
+        """
+        Схема в виде массивов ветвей (узел 0 — опорный).
+
+        n — количество узлов (включая узел 0),
+        start, end — номера узлов ветвей,
+        kind — типы ветвей ('R', 'E', 'C' или 'L'),
+        value — сопротивление в Ом, ЭДС в Вольтах, ёмкость в Фарадах или индуктивность в Генри.
+        """
+        self.n = n
+        self.start = np.asarray(start, dtype=np.int64)
+        self.end = np.asarray(end, dtype=np.int64)
+        self.kind = np.char.upper(np.asarray(kind, dtype='<U1'))
+        self.value = np.asarray(value, dtype=float)
+
+        unknown = ~np.isin(self.kind, KINDS)
+        if unknown.any():
+            raise CircuitError(f"Неизвестный тип ветви: {self.kind[unknown][0]}")
+        if len(self.start) and (min(self.start.min(), self.end.min()) < 0
+                                or max(self.start.max(), self.end.max()) >= n):
+            raise CircuitError(f"Номера узлов должны быть в диапазоне 0..{n - 1}")
+
+    @classmethod
+    def from_branches(cls, n, branches):
+        # branches — список кортежей (start_node, end_node, elem_type, value), как в main.py
+        start, end, kind, value = zip(*branches) if branches else ((), (), (), ())
+        return cls(n, start, end, kind, value)
+
+    def __len__(self):
+        return len(self.start)
+
+
+def source_branches(circuit, dc=True):
+    # Ветви с неизвестным током (отдельная строка в системе): источники ЭДС,
+    # а на постоянном токе ещё и катушки — они ведут себя как источник с нулевой ЭДС
+    sources = circuit.kind == 'E'
+    if dc:
+        sources |= circuit.kind == 'L'
+    return np.flatnonzero(sources)
+
+
+def incidence(circuit, branches, size):
+    # Столбец на ветвь: +1 в строке start_node, -1 в строке end_node (строки узла 0 нет)
+    columns = np.arange(len(branches))
+    rows = np.concatenate((circuit.start[branches], circuit.end[branches]))
+    cols = np.concatenate((columns, columns))
+    data = np.concatenate((np.ones(len(branches)), -np.ones(len(branches))))
+    keep = rows != 0
+    return scipy.sparse.csc_matrix((data[keep], (rows[keep] - 1, cols[keep])), shape=(size, len(branches)))
+
+
+def assemble(circuit, companion=None):
+    """
+    Составляет разреженную систему модифицированного узлового анализа (MNA).
+
+    Неизвестные: потенциалы V1..V_{n-1}, затем токи ветвей source_branches
+    (в том же порядке, что и ветви) — как символы V и I_E_* в символьном решении.
+    companion — проводимости эквивалентных схем конденсаторов и катушек (в порядке ветвей C и L)
+    для расчёта переходного процесса; без него схема считается на постоянном токе:
+    конденсатор — разрыв, катушка — перемычка.
+    Возвращает матрицу (CSC) и правую часть.
+    """
+    n = circuit.n
+    dc = companion is None
+    resistors = np.flatnonzero(circuit.kind == 'R')
+    conductance = 1.0 / circuit.value[resistors]
+    if not dc:
+        resistors = np.concatenate((resistors, np.flatnonzero(np.isin(circuit.kind, ('C', 'L')))))
+        conductance = np.concatenate((conductance, companion))
+    sources = source_branches(circuit, dc)
+    size = n - 1 + len(sources)
+
+    # Проводимости: +g на диагонали, -g вне диагонали
+    s = circuit.start[resistors]
+    e = circuit.end[resistors]
+    g = conductance
+    rows = [s, e, s, e]
+    cols = [s, e, e, s]
+    data = [g, g, -g, -g]
+
+    # Ток источника вытекает из start_node и втекает в end_node,
+    # а строка источника задаёт V_s - V_e = E
+    s = circuit.start[sources]
+    e = circuit.end[sources]
+    k = np.arange(n, n + len(sources))  # номера строк с учётом сдвига узлов на 1
+    ones = np.ones(len(sources))
+    rows += [s, e, k, k]
+    cols += [k, k, s, e]
+    data += [ones, -ones, ones, -ones]
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    data = np.concatenate(data)
+
+    # Узел 0 опорный: его строки и столбцы отбрасываем, остальные индексы сдвигаем на 1
+    keep = (rows != 0) & (cols != 0)
+    matrix = scipy.sparse.coo_matrix((data[keep], (rows[keep] - 1, cols[keep] - 1)), shape=(size, size)).tocsc()
+
+    rhs = np.zeros(size)
+    rhs[n - 1:] = np.where(circuit.kind[sources] == 'E', circuit.value[sources], 0.0)
+    return matrix, rhs
+
+
+def factorize(matrix):
+    # Разреженное LU-разложение; вырожденная матрица означает некорректную схему.
+    # Из-за округлений вырожденная матрица может дать не нулевой, а лишь очень малый ведущий элемент,
+    # поэтому он сравнивается с наибольшим (см. SINGULAR_PIVOT)
+    message = "Система вырождена: проверьте, что все узлы связаны с узлом 0 и нет контуров из одних источников ЭДС"
+    try:
+        lu = scipy.sparse.linalg.splu(matrix)
+    except RuntimeError:
+        raise CircuitError(message) from None
+    pivots = np.abs(lu.U.diagonal())
+    if len(pivots) and pivots.min() <= SINGULAR_PIVOT * pivots.max():
+        raise CircuitError(message)
+    return lu
+
+
+def currents(circuit, potentials, sources, source_currents):
+    # Ток резистора (V_s - V_e)/R из start_node в end_node, ток источника — из решения,
+    # ток конденсатора на постоянном токе равен нулю.
+    # Для нескольких правых частей последняя ось массивов — номер варианта.
+    result = np.zeros((len(circuit),) + potentials.shape[1:])
+    resistors = circuit.kind == 'R'
+    resistance = circuit.value[resistors].reshape((-1,) + (1,) * (potentials.ndim - 1))
+    result[resistors] = (potentials[circuit.start[resistors]] - potentials[circuit.end[resistors]]) / resistance
+    result[sources] = source_currents
+    return result
+
+
+def solve(circuit):
+    """
+    Численно решает схему на постоянном токе.
+
+    Возвращает массив узловых потенциалов (длины n, V[0] = 0) и массив токов в ветвях
+    (положительное направление — из start_node в end_node).
+    """
+    n = circuit.n
+    matrix, rhs = assemble(circuit)
+    solution = factorize(matrix).solve(rhs)
+
+    potentials = np.concatenate(([0.0], solution[:n - 1]))
+    return potentials, currents(circuit, potentials, source_branches(circuit), solution[n - 1:])
+
+
+def components(circuit):
+    # Связные компоненты схемы на постоянном токе (конденсатор — разрыв).
+    # Номера компонент идут по возрастанию наименьшего узла, компонента узла 0 — нулевая;
+    # возвращает номера компонент узлов и наименьший узел каждой компоненты
+    conducting = circuit.kind != 'C'
+    graph = scipy.sparse.coo_matrix((np.ones(np.count_nonzero(conducting)),
+                                     (circuit.start[conducting], circuit.end[conducting])),
+                                    shape=(circuit.n, circuit.n))
+    _, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+    _, lowest = np.unique(labels, return_index=True)
+    return labels, lowest
+
+
+def solve_pinned(circuit):
+    """
+    Решает схему на постоянном токе, как solve, допуская части схемы, не связанные с узлом 0.
+
+    Наименьший узел такой части подключается к узлу 0 источником с нулевой ЭДС: ток через него
+    равен нулю, а потенциалы части отсчитываются от этого узла (как floating в preprocess.solve).
+    Возвращает потенциалы, токи ветвей и номера компонент узлов (components).
+    """
+    labels, lowest = components(circuit)
+    pins = lowest[1:]
+    pinned = Circuit(circuit.n, np.concatenate((circuit.start, pins)),
+                     np.concatenate((circuit.end, np.zeros_like(pins))),
+                     np.concatenate((circuit.kind, np.full(len(pins), 'E'))),
+                     np.concatenate((circuit.value, np.zeros(len(pins)))))
+    potentials, branch_currents = solve(pinned)
+    return potentials, branch_currents[:len(circuit)], labels
+
+
+def inductor_offsets(circuit, potentials, labels):
+    """
+    Сдвиги потенциалов частей схемы, связанных с остальной только катушками без тока.
+
+    Ток катушек на границе части остаётся нулевым, значит, равна нулю и его производная:
+    сумма (V_s - V_e) / L по граничным катушкам. Это уравнения узлового анализа для сдвигов частей
+    с проводимостями 1/L. Часть узла 0 и наименьшая часть среди не связанных с ней катушками
+    остаются на месте. Возвращает сдвиг для каждой компоненты labels.
+    """
+    count = labels.max() + 1
+    inductors = np.flatnonzero(circuit.kind == 'L')
+    a = labels[circuit.start[inductors]]
+    b = labels[circuit.end[inductors]]
+    boundary = a != b
+    inductors, a, b = inductors[boundary], a[boundary], b[boundary]
+    w = 1.0 / circuit.value[inductors]
+    drop = w * (potentials[circuit.start[inductors]] - potentials[circuit.end[inductors]])
+
+    matrix = scipy.sparse.coo_matrix((np.concatenate((w, w, -w, -w)),
+                                      (np.concatenate((a, b, a, b)), np.concatenate((a, b, b, a)))),
+                                     shape=(count, count)).tocsc()
+    rhs = np.bincount(b, drop, count) - np.bincount(a, drop, count)
+
+    _, groups = scipy.sparse.csgraph.connected_components(matrix, directed=False)
+    free = np.ones(count, dtype=bool)
+    free[np.unique(groups, return_index=True)[1]] = False
+    offsets = np.zeros(count)
+    if free.any():
+        offsets[free] = scipy.sparse.linalg.spsolve(matrix[free][:, free], rhs[free])
+    return offsets
+
+
+class Factorization:
+    def __init__(self, circuit):
+        """
+        Однократное LU-разложение матрицы схемы для повторных решений.
+
+        Значения ЭДС входят только в правую часть, поэтому для новых значений источников
+        достаточно прямой и обратной подстановки. Изменение нескольких резисторов —
+        поправка малого ранга к матрице, она учитывается формулой Шермана — Моррисона — Вудбери
+        без нового разложения.
+        """
+        self.circuit = Circuit(circuit.n, circuit.start, circuit.end, circuit.kind, circuit.value.copy())
+        self.base_value = circuit.value.copy()
+        matrix, self.rhs = assemble(circuit)
+        self.lu = factorize(matrix)
+        self.sources = source_branches(circuit)
+        self.emf_rows = circuit.n - 1 + np.flatnonzero(circuit.kind[self.sources] == 'E')
+        self.update = None
+
+    def update_resistors(self, branches, values):
+        """
+        Задаёт новые сопротивления ветвям branches (индексы резисторов в схеме).
+
+        Значения отсчитываются от исходной схемы, поэтому ранг поправки равен
+        количеству резисторов, отличающихся от неё.
+        """
+        branches = np.atleast_1d(np.asarray(branches, dtype=np.int64))
+        if not np.all(self.circuit.kind[branches] == 'R'):
+            raise CircuitError("Изменять можно только сопротивления резисторов")
+        self.circuit.value[branches] = values
+
+        changed = np.flatnonzero((self.circuit.kind == 'R') & (self.circuit.value != self.base_value))
+        if len(changed) == 0:
+            self.update = None
+            return
+
+        # A' = A + U D U^T, где столбец U — (e_s - e_e) для изменённого резистора, D — изменения проводимостей
+        U = incidence(self.circuit, changed, self.rhs.shape[0])
+        D = 1.0 / self.circuit.value[changed] - 1.0 / self.base_value[changed]
+
+        # Z = A^{-1} U и малая матрица I + D U^T Z размера (ранг x ранг)
+        Z = self.lu.solve(U.toarray())
+        capacitance = np.eye(len(changed)) + D[:, np.newaxis] * (U.T @ Z)
+        self.update = (U, Z, D, capacitance)
+
+    def solve(self, emf=None):
+        """
+        Решает схему для значений ЭДС emf (в порядке ветвей E).
+
+        emf — массив формы (k,) или (k, batch) для batch вариантов сразу;
+        без emf используются значения из схемы.
+        Возвращает потенциалы формы (n,) или (n, batch) и токи формы (m,) или (m, batch).
+        """
+        n = self.circuit.n
+        if emf is None:
+            rhs = self.rhs
+        else:
+            emf = np.asarray(emf, dtype=float)
+            rhs = np.zeros((self.rhs.shape[0],) + emf.shape[1:])
+            rhs[self.emf_rows] = emf
+        solution = self.lu.solve(rhs)
+
+        if self.update is not None:
+            # (A + U D U^T)^{-1} b = y - Z (I + D U^T Z)^{-1} D U^T y, где y = A^{-1} b
+            U, Z, D, capacitance = self.update
+            correction = np.linalg.solve(capacitance, (D * (U.T @ solution).T).T)
+            solution = solution - Z @ correction
+
+        potentials = np.concatenate((np.zeros((1,) + solution.shape[1:]), solution[:n - 1]))
+        return potentials, currents(self.circuit, potentials, self.sources, solution[n - 1:])
+
+
+def transient(circuit, step, steps, method='trapezoidal', emf=None, initial='zero', nodes=None, branches=None):
+    """
+    Переходный процесс в схеме с конденсаторами и катушками.
+
+    Каждый конденсатор и катушка на шаге заменяются эквивалентной схемой: проводимость G
+    и источник тока J, зависящий от предыдущего шага (i = G (V_s - V_e) + J).
+    При постоянном шаге G не меняется, поэтому матрица раскладывается один раз,
+    а на каждом шаге меняется только правая часть.
+
+    step, steps — шаг по времени (с) и количество шагов,
+    method — 'trapezoidal' (метод трапеций) или 'euler' (неявный метод Эйлера),
+    emf — функция emf(t), возвращающая ЭДС источников (в порядке ветвей E); без неё ЭДС постоянны,
+    initial — 'zero' (конденсаторы разряжены, токи катушек нулевые) или 'dc' (установившийся режим),
+    nodes, branches — номера узлов и ветвей, которые нужно записывать (по умолчанию все).
+    Возвращает моменты времени (steps + 1), потенциалы (steps + 1, len(nodes))
+    и токи (steps + 1, len(branches)).
+    """
+    if method not in ('trapezoidal', 'euler'):
+        raise CircuitError(f"Неизвестный метод интегрирования: {method}")
+    if initial not in ('zero', 'dc'):
+        raise CircuitError(f"Неизвестное начальное состояние: {initial}")
+    n = circuit.n
+    nodes = np.arange(n) if nodes is None else np.asarray(nodes)
+    branches = np.arange(len(circuit)) if branches is None else np.asarray(branches)
+
+    dynamic = np.flatnonzero(np.isin(circuit.kind, ('C', 'L')))
+    capacitor = circuit.kind[dynamic] == 'C'
+    value = circuit.value[dynamic]
+
+    # Проводимости эквивалентных схем: C/h и h/L для метода Эйлера, 2C/h и h/(2L) для трапеций
+    factor = 1.0 if method == 'euler' else 2.0
+    companion = np.where(capacitor, factor * value / step, step / (factor * value))
+
+    matrix, rhs = assemble(circuit, companion)
+    lu = factorize(matrix)
+    sources = source_branches(circuit, dc=False)
+    B = incidence(circuit, dynamic, rhs.shape[0])
+    emf_values = circuit.value[sources] if emf is None else np.asarray(emf(0.0), dtype=float)
+
+    # Источник эквивалентной схемы J = a * v + b * i по напряжению и току на предыдущем шаге
+    if method == 'euler':
+        a = np.where(capacitor, -companion, 0.0)
+        b = np.where(capacitor, 0.0, 1.0)
+    else:
+        a = np.where(capacitor, -companion, companion)
+        b = np.where(capacitor, -1.0, 1.0)
+
+    # Согласованное начальное состояние. Для 'zero' конденсатор в момент 0 — источник с нулевой ЭДС,
+    # а катушка без тока — разрыв; узлы, связанные со схемой только катушками, получают потенциалы
+    # из условия нулевого тока катушек (inductor_offsets). Для 'dc' схема находится в установившемся режиме.
+    # Части схемы без связи с узлом 0 (например, между последовательными конденсаторами) отсчитываются
+    # от своего наименьшего узла.
+    if initial == 'dc':
+        start_circuit = Circuit(n, circuit.start, circuit.end, circuit.kind, circuit.value.copy())
+        start_circuit.value[sources] = emf_values
+        potentials, branch_currents, _ = solve_pinned(start_circuit)
+    else:
+        kept = np.flatnonzero(circuit.kind != 'L')
+        kind = np.where(circuit.kind[kept] == 'C', 'E', circuit.kind[kept])
+        value = circuit.value.copy()
+        value[sources] = emf_values
+        value = np.where(circuit.kind[kept] == 'C', 0.0, value[kept])
+        potentials, kept_currents, labels = solve_pinned(Circuit(n, circuit.start[kept], circuit.end[kept],
+                                                                 kind, value))
+        potentials += inductor_offsets(circuit, potentials, labels)[labels]
+        branch_currents = np.zeros(len(circuit))
+        branch_currents[kept] = kept_currents
+    dynamic_start = circuit.start[dynamic]
+    dynamic_end = circuit.end[dynamic]
+    voltage = potentials[dynamic_start] - potentials[dynamic_end]
+    current = branch_currents[dynamic]
+
+    # Записываемые токи: резисторы считаются по потенциалам, источники берутся из решения,
+    # конденсаторы и катушки — из эквивалентных схем
+    recorded_resistors = np.flatnonzero(circuit.kind[branches] == 'R')
+    resistors = branches[recorded_resistors]
+    resistor_start = circuit.start[resistors]
+    resistor_end = circuit.end[resistors]
+    resistance = circuit.value[resistors]
+    recorded_sources = np.flatnonzero(np.isin(branches, sources))
+    source_rows = n - 1 + np.searchsorted(sources, branches[recorded_sources])
+    recorded_dynamic = np.flatnonzero(np.isin(branches, dynamic))
+    dynamic_positions = np.searchsorted(dynamic, branches[recorded_dynamic])
+
+    times = step * np.arange(steps + 1)
+    recorded_potentials = np.empty((steps + 1, len(nodes)))
+    recorded_currents = np.empty((steps + 1, len(branches)))
+    recorded_potentials[0] = potentials[nodes]
+    recorded_currents[0] = branch_currents[branches]
+
+    for index in range(1, steps + 1):
+        history = a * voltage + b * current
+        step_rhs = rhs - B @ history
+        if emf is not None:
+            step_rhs[n - 1:] = emf(times[index])
+        solution = lu.solve(step_rhs)
+
+        potentials[1:] = solution[:n - 1]
+        voltage = potentials[dynamic_start] - potentials[dynamic_end]
+        current = companion * voltage + history
+
+        recorded_potentials[index] = potentials[nodes]
+        recorded_currents[index, recorded_resistors] = \
+            (potentials[resistor_start] - potentials[resistor_end]) / resistance
+        recorded_currents[index, recorded_sources] = solution[source_rows]
+        recorded_currents[index, recorded_dynamic] = current[dynamic_positions]
+
+    return times, recorded_potentials, recorded_currents
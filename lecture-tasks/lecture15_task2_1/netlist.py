@@ -0,0 +1,130 @@
+import re
+
+import mna
+
+# Формат нетлиста (подмножество SPICE), по одному элементу в строке:
+#
+#   .title делитель           — необязательное имя схемы
+#   * комментарий             — строки с '*' и всё после ';' пропускаются
+#   R1 1 2 10k                — резистор между узлами 1 и 2, сопротивление в Ом
+#   V1 1 0 5                  — источник ЭДС: V(1) - V(0) = 5 В (допустимы также имена на E)
+#   C1 2 0 10u                — конденсатор, ёмкость в Фарадах
+#   L1 2 3 1m                 — катушка, индуктивность в Генри
+#   .end                      — конец схемы; в одном файле может быть несколько схем
+#
+# Узлы 0 и gnd — опорные, остальные имена узлов произвольные. Имена элементов в схеме
+# не должны повторяться (без учёта регистра, как в SPICE).
+# У чисел допустимы суффиксы SPICE: f p n u m k meg g t (регистр не важен, единицы после них игнорируются).
+
+ELEMENT_KINDS = {'R': 'R', 'V': 'E', 'E': 'E', 'C': 'C', 'L': 'L'}
+GROUND_NAMES = ('0', 'gnd')
+
+SUFFIXES = {'f': 1e-15, 'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
+            'k': 1e3, 'meg': 1e6, 'g': 1e9, 't': 1e12}
+NUMBER = re.compile(r'([-+]?(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?)(meg|[fpnumkgt])?', re.IGNORECASE)
+
+
+class NetlistError(ValueError):
+    pass
+
+
+class Netlist:
+    def __init__(self, title, node_names, names, circuit, error=None):
+        """
+        Разобранная схема.
+
+        node_names — имена узлов по номерам (node_names[0] — опорный узел),
+        names — имена элементов в порядке ветвей схемы circuit (mna.Circuit),
+        error — сообщение об ошибке разбора; у такой схемы нет ни элементов, ни circuit.
+        """
+        self.title = title
+        self.node_names = node_names
+        self.names = names
+        self.circuit = circuit
+        self.error = error
+
+
+def parse_value(text):
+    match = NUMBER.match(text)
+    if match is None:
+        raise NetlistError(f"Некорректное число: {text}")
+    number, suffix = match.groups()
+    return float(number) * (SUFFIXES[suffix.lower()] if suffix else 1.0)
+
+
+def parse(lines, default_title='circuit', recover=False):
+    """
+    Потоково разбирает строки нетлиста и выдаёт схемы (Netlist) по одной.
+
+    Ошибка в строке элемента вызывает NetlistError, а при recover=True схема пропускается
+    до своего .end и вместо неё выдаётся Netlist с сообщением error, так что остальные схемы
+    файла разбираются как обычно.
+    """
+    title = None
+    nodes = {}
+    names, starts, ends, kinds, values = [], [], [], [], []
+    seen = set()
+    error = None
+    count = 0
+
+    def node_index(name):
+        if name.lower() in GROUND_NAMES:
+            return 0
+        # Узлы нумеруются с 1 в порядке первого появления
+        return nodes.setdefault(name, len(nodes) + 1)
+
+    def finish():
+        if error is not None:
+            return Netlist(title or f"{default_title}_{count}", [], [], None, error)
+        node_names = ['0'] + list(nodes)
+        circuit = mna.Circuit(len(node_names), starts, ends, kinds, values)
+        return Netlist(title or f"{default_title}_{count}", node_names, names, circuit)
+
+    for line_number, line in enumerate(lines, 1):
+        tokens = line.split(';', 1)[0].split()
+        if not tokens or tokens[0].startswith('*'):
+            continue
+
+        keyword = tokens[0].lower()
+        if keyword == '.title':
+            title = ' '.join(tokens[1:])
+        elif keyword == '.end':
+            if names or error is not None:
+                yield finish()
+                count += 1
+            title = None
+            nodes = {}
+            names, starts, ends, kinds, values = [], [], [], [], []
+            seen = set()
+            error = None
+        elif keyword.startswith('.'):
+            continue  # остальные директивы SPICE не поддерживаются и пропускаются
+        elif error is None:
+            try:
+                kind = ELEMENT_KINDS.get(tokens[0][0].upper())
+                if kind is None or len(tokens) < 4:
+                    raise NetlistError(f"не удалось разобрать элемент '{line.strip()}'")
+                if tokens[0].upper() in seen:
+                    raise NetlistError(f"повторное имя элемента '{tokens[0]}'")
+                value = parse_value(tokens[3])
+            except NetlistError as exception:
+                error = f"Строка {line_number}: {exception}"
+                if not recover:
+                    raise NetlistError(error) from None
+                continue
+            seen.add(tokens[0].upper())
+            names.append(tokens[0])
+            starts.append(node_index(tokens[1]))
+            ends.append(node_index(tokens[2]))
+            kinds.append(kind)
+            values.append(value)
+
+    # Последняя схема может быть без .end
+    if names or error is not None:
+        yield finish()
+
+
+def read(path, recover=False):
+    # Генератор схем из файла; файл читается построчно
+    with open(path, encoding='utf-8') as file:
+        yield from parse(file, default_title=path, recover=recover)
@@ -0,0 +1,176 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+
+import mna
+
+
+def reduce_resistors(circuit):
+    """
+    Сворачивает параллельные и последовательные резисторы.
+
+    Узел, к которому подключены только резисторы (не больше двух после объединения
+    параллельных), исключается: два резистора заменяются одним с суммой сопротивлений,
+    висящий резистор удаляется (тока в нём нет). Узел 0 и узлы с источниками и катушками
+    не исключаются; конденсаторы на постоянном токе — разрыв и не учитываются.
+
+    Возвращает оставшиеся резисторы (словарь id -> [start, end, R]), признаки исключённых
+    и изолированных узлов и журнал исключений (node, x, y, R1, R2) для восстановления потенциалов:
+    V(node) = V(x) - (V(x) - V(y)) * R1 / (R1 + R2).
+    """
+    n = circuit.n
+    others = np.flatnonzero(np.isin(circuit.kind, ('E', 'L')))
+    pinned = np.zeros(n, dtype=bool)
+    pinned[0] = True
+    pinned[circuit.start[others]] = True
+    pinned[circuit.end[others]] = True
+
+    resistors = {}
+    pairs = {}
+    adjacency = [set() for _ in range(n)]
+    next_id = len(circuit)
+
+    def add(branch_id, a, b, resistance):
+        # Резистор, замкнутый на один узел, тока не проводит
+        if a == b:
+            return
+        key = a * n + b if a < b else b * n + a
+        existing = pairs.get(key)
+        if existing is not None:
+            # Параллельное соединение
+            r = resistors[existing][2]
+            resistors[existing][2] = r * resistance / (r + resistance)
+            return
+        resistors[branch_id] = [a, b, resistance]
+        pairs[key] = branch_id
+        adjacency[a].add(branch_id)
+        adjacency[b].add(branch_id)
+
+    def remove(branch_id):
+        a, b, resistance = resistors.pop(branch_id)
+        del pairs[a * n + b if a < b else b * n + a]
+        adjacency[a].discard(branch_id)
+        adjacency[b].discard(branch_id)
+        return a, b, resistance
+
+    for branch_id in np.flatnonzero(circuit.kind == 'R'):
+        add(int(branch_id), int(circuit.start[branch_id]), int(circuit.end[branch_id]),
+            float(circuit.value[branch_id]))
+
+    eliminated = np.zeros(n, dtype=bool)
+    isolated = np.zeros(n, dtype=bool)
+    records = []
+    queue = [node for node in range(1, n) if not pinned[node] and len(adjacency[node]) <= 2]
+
+    while queue:
+        node = queue.pop()
+        if pinned[node] or eliminated[node] or isolated[node] or len(adjacency[node]) > 2:
+            continue
+
+        branches = list(adjacency[node])
+        if not branches:
+            isolated[node] = True
+            continue
+
+        eliminated[node] = True
+        a, b, r1 = remove(branches[0])
+        x = b if a == node else a
+        if len(branches) == 1:
+            # Висящий резистор: потенциал узла равен потенциалу соседа
+            records.append((node, x, x, 0.0, 1.0))
+            queue.append(x)
+        else:
+            # Последовательное соединение x - node - y
+            a, b, r2 = remove(branches[1])
+            y = b if a == node else a
+            records.append((node, x, y, r1, r2))
+            add(next_id, x, y, r1 + r2)
+            next_id += 1
+            queue.extend((x, y))
+
+    # Узлы, с которых сняты все ветви, после исключения соседей
+    queue = [node for node in range(1, n) if not pinned[node] and not eliminated[node] and not adjacency[node]]
+    isolated[queue] = True
+    return resistors, eliminated, isolated, records
+
+
+def solve(circuit, jobs=1):
+    """
+    Решает схему на постоянном токе с предварительной обработкой графа.
+
+    Резисторы сворачиваются (reduce_resistors), оставшаяся схема делится на связные компоненты,
+    которые решаются независимо (при jobs > 1 — в нескольких процессах), затем потенциалы
+    исключённых узлов восстанавливаются и токи считаются для всех исходных ветвей.
+
+    Компонента без узла 0 не имеет опорного потенциала: потенциалы в ней отсчитываются
+    от её узла с наименьшим номером, такие узлы отмечаются в массиве floating.
+    Возвращает потенциалы (n), токи (m) и floating (n).
+    """
+    n = circuit.n
+    resistors, eliminated, isolated, records = reduce_resistors(circuit)
+
+    # Оставшиеся узлы нумеруются подряд, узел 0 остаётся нулевым
+    remaining = np.flatnonzero(~eliminated & ~isolated)
+    index = np.full(n, -1, dtype=np.int64)
+    index[remaining] = np.arange(len(remaining))
+
+    others = np.flatnonzero(np.isin(circuit.kind, ('E', 'L')))
+    reduced = list(resistors.values())
+    start = np.concatenate((index[[branch[0] for branch in reduced]], index[circuit.start[others]])).astype(np.int64)
+    end = np.concatenate((index[[branch[1] for branch in reduced]], index[circuit.end[others]])).astype(np.int64)
+    kind = np.concatenate((np.full(len(reduced), 'R'), circuit.kind[others]))
+    value = np.concatenate(([branch[2] for branch in reduced], circuit.value[others]))
+
+    # Связные компоненты оставшейся схемы
+    size = len(remaining)
+    graph = scipy.sparse.coo_matrix((np.ones(len(start)), (start, end)), shape=(size, size))
+    count, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+
+    # Ветви каждой компоненты подряд; узлы компоненты по возрастанию, первый из них опорный
+    branch_order = np.argsort(labels[start], kind='stable')
+    branch_bounds = np.searchsorted(labels[start][branch_order], np.arange(count + 1))
+    node_order = np.argsort(labels, kind='stable')
+    node_bounds = np.searchsorted(labels[node_order], np.arange(count + 1))
+    local = np.empty(size, dtype=np.int64)
+
+    components = []
+    for component in range(count):
+        nodes = node_order[node_bounds[component]:node_bounds[component + 1]]
+        branches = branch_order[branch_bounds[component]:branch_bounds[component + 1]]
+        local[nodes] = np.arange(len(nodes))
+        components.append((nodes, branches, mna.Circuit(len(nodes), local[start[branches]], local[end[branches]],
+                                                        kind[branches], value[branches])))
+
+    solvable = [part for _, branches, part in components if len(branches)]
+    if jobs > 1 and len(solvable) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = iter(list(executor.map(mna.solve, solvable)))
+    else:
+        results = map(mna.solve, solvable)
+
+    potentials = np.zeros(n)
+    floating = np.zeros(n, dtype=bool)
+    reduced_currents = np.zeros(len(start))
+    for nodes, branches, part in components:
+        nodes_original = remaining[nodes]
+        floating[nodes_original] = nodes_original[0] != 0
+        if len(branches):
+            part_potentials, part_currents = next(results)
+            potentials[nodes_original] = part_potentials
+            reduced_currents[branches] = part_currents
+
+    # Восстанавливаем потенциалы исключённых узлов в обратном порядке
+    floating[isolated] = True
+    for node, x, y, r1, r2 in reversed(records):
+        potentials[node] = potentials[x] - (potentials[x] - potentials[y]) * r1 / (r1 + r2)
+        floating[node] = floating[x]
+
+    # Токи резисторов по потенциалам, источников и катушек — из решения, конденсаторов — ноль
+    branch_currents = np.zeros(len(circuit))
+    is_resistor = circuit.kind == 'R'
+    branch_currents[is_resistor] = (potentials[circuit.start[is_resistor]] - potentials[circuit.end[is_resistor]]) \
+        / circuit.value[is_resistor]
+    branch_currents[others] = reduced_currents[len(reduced):]
+    return potentials, branch_currents, floating
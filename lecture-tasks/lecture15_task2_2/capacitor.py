@@ -0,0 +1,83 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+# Электрическая постоянная
+EPS0 = 8.8541878128e-12  # Ф/м
+
+# Таблица материалов по умолчанию лежит рядом с программой
+MATERIALS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials.csv")
+
+
+class Materials:
+    def __init__(self, names, epsilon_r):
+        """
+        Таблица диэлектрических проницаемостей с индексом по названию материала.
+
+        Названия приводятся к нижнему регистру без пробелов по краям, как и при поиске.
+        """
+        self.names = np.asarray([str(name).strip().lower() for name in names], dtype=str)
+        self.epsilon_r = np.asarray(epsilon_r, dtype=float)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def load(cls, path=MATERIALS_PATH):
+        # CSV со столбцами name,epsilon_r или JSON-словарь {"название": epsilon_r}
+        with open(path, encoding="utf-8") as file:
+            if path.lower().endswith(".json"):
+                table = json.load(file)
+                return cls(list(table.keys()), list(table.values()))
+            rows = list(csv.DictReader(file))
+        return cls([row["name"] for row in rows], [float(row["epsilon_r"]) for row in rows])
+
+    def lookup(self, materials):
+        """
+        Проницаемости для массива названий материалов (или их номеров в таблице).
+
+        Каждое уникальное название ищется в индексе один раз, поэтому поиск
+        для миллионов точек сводится к np.unique и выборке по массиву.
+        """
+        materials = np.asarray(materials)
+        if np.issubdtype(materials.dtype, np.integer):
+            return self.epsilon_r[materials]
+
+        unique, inverse = np.unique(materials.astype(str), return_inverse=True)
+        unique = [name.strip().lower() for name in unique]
+        unknown = [name for name in unique if name not in self.index]
+        if unknown:
+            raise ValueError(f"Неизвестный диэлектрик '{unknown[0]}'. Используйте одно из: {self.names.tolist()}")
+        positions = np.array([self.index[name] for name in unique], dtype=np.int64)
+        return self.epsilon_r[positions[inverse].reshape(materials.shape)]
+
+
+def calculate(U, d, A, epsilon_r, connected):
+    """
+    Параметры плоского конденсатора до и после введения диэлектрика для массивов точек.
+
+    U, d, A — напряжение (В), расстояние между пластинами (м) и площадь пластин (м^2),
+    epsilon_r — проницаемость диэлектрика (см. Materials.lookup),
+    connected — остаётся ли конденсатор подключённым к источнику (bool).
+    Аргументы транслируются по правилам NumPy. Возвращает словарь массивов:
+    C0, Q0, E0 — без диэлектрика; C, Q, U, E — с диэлектриком.
+    """
+    U, d, A, epsilon_r, connected = np.broadcast_arrays(
+        np.asarray(U, dtype=float), np.asarray(d, dtype=float), np.asarray(A, dtype=float),
+        np.asarray(epsilon_r, dtype=float), np.asarray(connected, dtype=bool))
+
+    # Ёмкость, заряд и напряжённость без диэлектрика
+    C0 = EPS0 * A / d
+    Q0 = C0 * U
+    E0 = U / d
+
+    # Ёмкость с диэлектриком
+    C = epsilon_r * C0
+
+    # Подключённый конденсатор сохраняет U (меняется заряд),
+    # отключённый сохраняет заряд Q0 (меняется напряжение)
+    Q_new = np.where(connected, C * U, Q0)
+    U_new = np.where(connected, U, Q0 / C)
+    E_new = U_new / d
+
+    return {"C0": C0, "Q0": Q0, "E0": E0, "C": C, "Q": Q_new, "U": U_new, "E": E_new}
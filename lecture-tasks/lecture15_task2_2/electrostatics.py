@@ -0,0 +1,200 @@
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from capacitor import EPS0
+
+
+def face_permittivity(epsilon_r, fixed):
+    # Проницаемость на гранях между соседними узлами — среднее гармоническое,
+    # оно правильно передаёт скачок D_n на границе двух диэлектриков.
+    # Узел проводника (fixed) своей проницаемости не имеет: у грани берётся проницаемость соседа.
+    epsilon_r = np.asarray(epsilon_r, dtype=float)
+    faces = []
+    for axis in (1, 0):
+        first = np.delete(epsilon_r, -1, axis=axis)
+        second = np.delete(epsilon_r, 0, axis=axis)
+        first_fixed = np.delete(fixed, -1, axis=axis)
+        second_fixed = np.delete(fixed, 0, axis=axis)
+        face = 2 * first * second / (first + second)
+        face = np.where(first_fixed, second, np.where(second_fixed, first, face))
+        faces.append(face)
+    return faces
+
+
+def assemble(epsilon_r, fixed, values, dtype=np.float64):
+    """
+    Разреженная система для div(eps grad phi) = 0 на сетке узлов (ny, nx) с шагом h.
+
+    На внешней границе области нормальная составляющая поля равна нулю,
+    в узлах fixed (пластины) потенциал задан значениями values. Строки заданных узлов
+    заменяются единичными, а их вклад переносится в правую часть, поэтому матрица
+    остаётся симметричной и положительно определённой. Шаг h в 2D сокращается.
+    Матрица и правая часть возвращаются в типе dtype.
+    """
+    ny, nx = epsilon_r.shape
+    ex, ey = face_permittivity(epsilon_r, fixed)
+    index = np.arange(nx * ny).reshape(ny, nx)
+
+    # Связи между соседями по x и по y
+    a = np.concatenate((index[:, :-1].ravel(), index[:-1, :].ravel()))
+    b = np.concatenate((index[:, 1:].ravel(), index[1:, :].ravel()))
+    w = np.concatenate((ex.ravel(), ey.ravel()))
+
+    fixed = fixed.ravel()
+    values = np.where(fixed, values.ravel(), 0.0)
+    diagonal = np.bincount(a, w, nx * ny) + np.bincount(b, w, nx * ny)
+
+    # Связь свободного узла с заданным уходит в правую часть
+    rhs = np.zeros(nx * ny)
+    np.add.at(rhs, a, np.where(fixed[b], w * values[b], 0.0))
+    np.add.at(rhs, b, np.where(fixed[a], w * values[a], 0.0))
+    rhs[fixed] = values[fixed]
+    diagonal[fixed] = 1.0
+
+    free = ~fixed[a] & ~fixed[b]
+    rows = np.concatenate((a[free], b[free], np.arange(nx * ny)))
+    cols = np.concatenate((b[free], a[free], np.arange(nx * ny)))
+    data = np.concatenate((-w[free], -w[free], diagonal))
+    matrix = scipy.sparse.csr_matrix((data.astype(dtype), (rows, cols)), shape=(nx * ny, nx * ny))
+    return matrix, rhs.astype(dtype)
+
+
+def interpolation(n, dtype=np.float64):
+    # Линейная интерполяция с грубой сетки из (n + 1) // 2 узлов на сетку из n узлов
+    coarse = (n + 1) // 2
+    rows = np.arange(n)
+    left = rows // 2
+    right = np.minimum((rows + 1) // 2, coarse - 1)
+    weight = np.where(rows % 2 == 0, 1.0, 0.5)
+    data = np.concatenate((weight, np.where(rows % 2 == 0, 0.0, 0.5))).astype(dtype)
+    matrix = scipy.sparse.csr_matrix((data, (np.concatenate((rows, rows)), np.concatenate((left, right)))),
+                                     shape=(n, coarse))
+    matrix.eliminate_zeros()
+    return matrix
+
+
+class Multigrid:
+    def __init__(self, matrix, shape, coarsest=2000, smoothing=2, omega=2 / 3):
+        """
+        Геометрический многосеточный V-цикл для прекондиционирования метода сопряжённых градиентов.
+
+        Грубые операторы строятся по Галёркину (P^T A P), сглаживатель — взвешенный метод Якоби
+        с одинаковым числом шагов до и после, так что V-цикл симметричен и подходит для CG.
+        Все уровни хранятся в типе исходной матрицы.
+        """
+        self.levels = []
+        self.smoothing = smoothing
+        self.omega = omega
+        ny, nx = shape
+        while matrix.shape[0] > coarsest and min(nx, ny) > 3:
+            P = scipy.sparse.kron(interpolation(ny, matrix.dtype), interpolation(nx, matrix.dtype), format='csr')
+            self.levels.append((matrix, 1.0 / matrix.diagonal(), P))
+            matrix = (P.T @ matrix @ P).tocsr()
+            ny, nx = (ny + 1) // 2, (nx + 1) // 2
+        self.coarse = scipy.sparse.linalg.splu(matrix.tocsc())
+
+    def cycle(self, rhs, level=0):
+        if level == len(self.levels):
+            return self.coarse.solve(rhs)
+        matrix, inverse_diagonal, P = self.levels[level]
+
+        x = self.omega * inverse_diagonal * rhs
+        for _ in range(self.smoothing - 1):
+            x += self.omega * inverse_diagonal * (rhs - matrix @ x)
+        x += P @ self.cycle(P.T @ (rhs - matrix @ x), level + 1)
+        for _ in range(self.smoothing):
+            x += self.omega * inverse_diagonal * (rhs - matrix @ x)
+        return x
+
+    def operator(self):
+        size = self.levels[0][0].shape[0] if self.levels else self.coarse.shape[0]
+        dtype = self.levels[0][0].dtype if self.levels else self.coarse.L.dtype
+        return scipy.sparse.linalg.LinearOperator((size, size), matvec=self.cycle, dtype=dtype)
+
+
+def solve_potential(epsilon_r, fixed, values, tol=1e-8, multigrid=True, dtype=np.float64):
+    """
+    Потенциал на сетке при заданной карте проницаемости epsilon_r (ny, nx).
+
+    fixed — маска узлов с заданным потенциалом, values — значения в них.
+    Система решается методом сопряжённых градиентов с многосеточным (или диагональным)
+    прекондиционером. При dtype=np.float32 матрицы и векторы занимают вдвое меньше памяти,
+    но невязка не опускается заметно ниже точности float32, поэтому tol ограничивается
+    снизу 30 машинными эпсилон. Возвращает phi (ny, nx) и число итераций.
+    """
+    epsilon_r = np.asarray(epsilon_r, dtype=float)
+    tol = max(tol, 30 * np.finfo(dtype).eps)
+    matrix, rhs = assemble(epsilon_r, fixed, values, dtype)
+    if multigrid:
+        preconditioner = Multigrid(matrix, epsilon_r.shape).operator()
+    else:
+        inverse_diagonal = 1.0 / matrix.diagonal()
+        preconditioner = scipy.sparse.linalg.LinearOperator(matrix.shape, matvec=lambda r: inverse_diagonal * r,
+                                                            dtype=matrix.dtype)
+
+    iterations = 0
+
+    def count(_):
+        nonlocal iterations
+        iterations += 1
+
+    phi, info = scipy.sparse.linalg.cg(matrix, rhs, rtol=tol, M=preconditioner, callback=count,
+                                       maxiter=10 * rhs.size)
+    if info != 0:
+        raise RuntimeError(f"Метод сопряжённых градиентов не сошёлся за {info} итераций")
+    return phi.reshape(epsilon_r.shape), iterations
+
+
+def field_energy(phi, epsilon_r, fixed):
+    # Энергия поля на единицу длины вдоль третьей оси: W = 1/2 * eps0 * сумма eps (delta phi)^2 по граням
+    ex, ey = face_permittivity(epsilon_r, fixed)
+    return 0.5 * EPS0 * (np.sum(ex * np.diff(phi, axis=1) ** 2) + np.sum(ey * np.diff(phi, axis=0) ** 2))
+
+
+def plate_capacitor(width, gap, depth, epsilon_r=None, margin=None, max_cells=1000, cells_per_gap=20,
+                    multigrid=True):
+    """
+    Ёмкость плоского конденсатора по энергии поля с учётом краевых эффектов.
+
+    Решается двумерное сечение: пластины шириной width (м) на расстоянии gap (м),
+    длина пластин вдоль третьей оси depth (м), так что площадь A = width * depth.
+    epsilon_r — функция epsilon_r(X, Y) (координаты в метрах, начало в центре конденсатора,
+    пластины при Y = ±gap/2) или число; по умолчанию вакуум.
+    margin — расстояние от пластин до границы области (по умолчанию 10 * gap).
+
+    Возвращает словарь: C — численная ёмкость, C_ideal — по формуле eps * EPS0 * A / d
+    с проницаемостью в центре зазора, а также X, Y, phi и число итераций.
+    """
+    margin = 10 * gap if margin is None else margin
+
+    # Шаг сетки: зазор разбивается на целое число ячеек, общий размер ограничен max_cells
+    half_x = width / 2 + margin
+    half_y = gap / 2 + margin
+    h = max(gap / cells_per_gap, 2 * max(half_x, half_y) / max_cells)
+    gap_cells = max(2, 2 * round(gap / (2 * h)))
+    h = gap / gap_cells
+    nx = 2 * int(np.ceil(half_x / h)) + 1
+    ny = 2 * int(np.ceil(half_y / h)) + 1
+
+    x = (np.arange(nx) - nx // 2) * h
+    y = (np.arange(ny) - ny // 2) * h
+    X, Y = np.meshgrid(x, y)
+
+    if epsilon_r is None:
+        epsilon_r = 1.0
+    epsilon_map = np.broadcast_to(epsilon_r(X, Y) if callable(epsilon_r) else epsilon_r, X.shape).astype(float)
+
+    # Пластины — линии узлов с потенциалами +1/2 и -1/2 (U = 1 В)
+    on_plate = np.abs(X) <= width / 2 + 1e-12 * h
+    top = on_plate & (np.arange(ny)[:, np.newaxis] == ny // 2 + gap_cells // 2)
+    bottom = on_plate & (np.arange(ny)[:, np.newaxis] == ny // 2 - gap_cells // 2)
+    fixed = top | bottom
+    values = np.where(top, 0.5, np.where(bottom, -0.5, 0.0))
+
+    phi, iterations = solve_potential(epsilon_map, fixed, values, multigrid=multigrid)
+
+    # C = 2W / U^2 при U = 1 В
+    C = 2 * field_energy(phi, epsilon_map, fixed) * depth
+    C_ideal = epsilon_map[ny // 2, nx // 2] * EPS0 * width * depth / gap
+    return {"C": C, "C_ideal": C_ideal, "X": X, "Y": Y, "phi": phi, "iterations": iterations}
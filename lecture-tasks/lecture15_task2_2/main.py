@@ -1,13 +1,14 @@
+import numpy as np
+
+from capacitor import Materials, calculate
+from electrostatics import plate_capacitor
+
+
 def main():
     import sys
 
-    # Диэлектрические проницаемости некоторых материалов
-    dielectric_map = {
-        "вакуум": 1.0,
-        "воздух": 1.00059,
-        "стекло": 5.0,
-        "вода": 80.0
-    }
+    # Диэлектрические проницаемости материалов (таблица materials.csv)
+    materials = Materials.load()
 
     # Ввод данных
     print("Программа для расчёта параметров плоского конденсатора.\n")
@@ -16,7 +17,7 @@ def main():
         d = float(input("Введите расстояние между пластинами d (м): "))
         A = float(input("Введите площадь пластин A (м^2): "))
         dielectric_input = input(
-            "Введите тип диэлектрика (например: вакуум, воздух, стекло, вода): "
+            f"Введите тип диэлектрика (например: {', '.join(materials.names[:4])}): "
         ).strip().lower()
 
         connected_input = input(
@@ -27,37 +28,21 @@ def main():
         print("Ошибка ввода. Убедитесь, что вы вводите числа в правильном формате.")
         sys.exit(1)
 
-    # Проверяем наличие введённого диэлектрика в словаре
-    if dielectric_input not in dielectric_map:
-        print(
-            f"Неизвестный диэлектрик '{dielectric_input}'. "
-            f"Используйте одно из: {list(dielectric_map.keys())}"
-        )
+    # Проверяем наличие введённого диэлектрика в таблице
+    try:
+        epsilon_r = materials.lookup(dielectric_input)
+    except ValueError as error:
+        print(error)
         sys.exit(1)
 
-    # Константы
-    EPS0 = 8.8541878128e-12  # Ф/м
-
-    # Ищем диэлектрическую проницаемость
-    epsilon_r = dielectric_map[dielectric_input]
-
-    # Ёмкость без диэлектрика
-    C0 = EPS0 * A / d
-
-    # Заряд и напряжённость без диэлектрика (до введения диэлектрика)
-    Q0 = C0 * U
-    E0 = U / d
-
-    # Вычисляем новую ёмкость с учётом диэлектрика
-    C = epsilon_r * C0
+    connected = connected_input == "да"
+    result = calculate(U, d, A, epsilon_r, connected)
+    C0, Q0, E0 = result["C0"], result["Q0"], result["E0"]
+    C, Q_new, U_new, E_new = result["C"], result["Q"], result["U"], result["E"]
 
     # Логика, зависящая от подключения к источнику
-    if connected_input == "да":
-        # Конденсатор остаётся подключённым → U не меняется
-        U_new = U
-        Q_new = C * U_new  # заряд изменится
-        E_new = U_new / d  # напряжённость
-
+    if connected:
+        # Конденсатор остаётся подключённым → U не меняется, заряд изменится
         print("\nРезультаты (конденсатор подключён к источнику):")
         print(f"  - Ёмкость C  = {C:.4e} Ф")
         print(f"  - Заряд Q    = {Q_new:.4e} Кл")
@@ -65,10 +50,6 @@ def main():
 
     else:
         # Конденсатор отключается → Q не меняется (равен Q0), меняется U
-        Q_new = Q0
-        U_new = Q_new / C  # новое напряжение
-        E_new = U_new / d  # новая напряжённость
-
         print("\nРезультаты (конденсатор отключён от источника):")
         print(f"  - Ёмкость C  = {C:.4e} Ф")
         print(f"  - Заряд Q    = {Q_new:.4e} Кл (не изменился)")
@@ -81,6 +62,20 @@ def main():
     print(f"  - Q0 = {Q0:.4e} Кл")
     print(f"  - E0 = {E0:.4e} В/м")
 
+    # Проверка формулы C = eps * EPS0 * A / d численным расчётом поля с краевыми эффектами
+    # (квадратные пластины, двумерное сечение, диэлектрик заполняет зазор между пластинами)
+    check_input = input("\nПроверить ёмкость численно с учётом краевых эффектов? (да/нет): ").strip().lower()
+    if check_input == "да":
+        width = np.sqrt(A)
+
+        def gap_dielectric(X, Y):
+            inside = (np.abs(X) <= width / 2) & (np.abs(Y) <= d / 2)
+            return np.where(inside, epsilon_r, 1.0)
+
+        numeric = plate_capacitor(width, d, width, epsilon_r=gap_dielectric)
+        print(f"  - C (численно)  = {numeric['C']:.4e} Ф")
+        print(f"  - C / C_формула = {numeric['C'] / C:.4f}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,33 +1,74 @@
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from video import FrameWriter
 
 # Enter radius and center of mass velocity
 radius = float(input("Enter the radius of the wheel: "))
 velocity = float(input("Enter the center of mass velocity: "))
 
+# Tracked points as distance from the center in wheel radii and initial angle (r/R = 1 is the rim,
+# r/R < 1 lies on a spoke, r/R != 1 gives a trochoid instead of a cycloid)
+points_input = input("Enter tracked points as r/R[:angle_deg] separated by spaces (empty for one rim point): ").split()
+tracked_points = []
+for point in points_input:
+    # The angle is optional and defaults to 0
+    values = point.split(':')
+    try:
+        if len(values) > 2:
+            raise ValueError
+        tracked_points.append((float(values[0]), float(values[1]) if len(values) == 2 else 0.0))
+    except ValueError:
+        print(f"Invalid tracked point '{point}', expected r/R or r/R:angle_deg, e.g. 1 or 0.5:90")
+        sys.exit(1)
+tracked_points = tracked_points or [(1.0, 0.0)]
+ratios = np.array([point[0] for point in tracked_points])[:, np.newaxis]
+phases = np.radians([point[1] for point in tracked_points])[:, np.newaxis]
+
+# Number of animation frames for the five rotations; more frames give a smoother animation
+frame_count = int(input("Enter the number of frames: "))
+if frame_count <= 0:
+    print("The number of frames must be positive")
+    sys.exit(1)
+
+# Export renders frames offscreen and streams them to a video file instead of showing a window
+video_path = input("Enter output video file (empty to show the animation): ").strip()
+if video_path:
+    plt.switch_backend('agg')
+
 # Calculate the maximum theta based on the desired number of wheel rotations
 num_rotations = 5
 theta_max = num_rotations * 2 * np.pi  # Five full rotations
 
 # Time array for animation based on velocity
 t_max = theta_max / velocity
-frame_count = 1000  # Total frames for animation
 time = np.linspace(0, t_max, frame_count)
 
 # Calculate theta and position of the cycloid path
 theta = velocity * time
 
+# Precompute the paths of all tracked points once, frames only slice them
+path_x = radius * (theta - ratios * np.sin(theta + phases))
+path_y = radius * (1 - ratios * np.cos(theta + phases))
+
+# Precompute the wheel outline around its center
+theta_circle = np.linspace(0, 2 * np.pi, 100)
+circle_x = radius * np.cos(theta_circle)
+circle_y = radius + radius * np.sin(theta_circle)
+
 # Create a figure and axes
 fig, ax = plt.subplots()
 ax.set_xlim((0, num_rotations * 2 * np.pi * radius))
 ax.set_ylim((0, 15 * radius))
 ax.set_aspect('equal')
 
-# Create the line for the cycloid path
-line, = ax.plot([], [], 'b-', lw = 2, label = 'Cycloid Path')
+# Create the lines for the cycloid (trochoid) paths
+lines = [ax.plot([], [], '-', lw = 2, label = 'Cycloid Path' if i == 0 else None)[0]
+         for i in range(len(tracked_points))]
 
-# Add dot for the current position on the wheel
+# Add dots for the current positions on the wheel
 dot, = ax.plot([], [], 'ro', label = 'Point on Wheel')
 
 # Add a circle to represent the wheel itself
@@ -36,37 +77,40 @@ wheel, = ax.plot([], [], 'g--', lw = 1, label = 'Wheel')
 
 # Initialize function for the animation
 def init():
-    line.set_data([], [])
+    for line in lines:
+        line.set_data([], [])
     dot.set_data([], [])
     wheel.set_data([], [])
-    return line, dot, wheel
+    return (*lines, dot, wheel)
 
 
 # Update function for the animation
 def update(frame):
-    # Cycloid path
-    x = radius * (theta[:frame + 1] - np.sin(theta[:frame + 1]))
-    y = radius * (1 - np.cos(theta[:frame + 1]))
-    line.set_data(x, y)
+    # Cycloid paths
+    for line, x, y in zip(lines, path_x, path_y):
+        line.set_data(x[:frame + 1], y[:frame + 1])
 
-    # Position of dot on the wheel
-    x_dot = radius * theta[frame] - radius * np.sin(theta[frame])
-    y_dot = radius - radius * np.cos(theta[frame])
-    dot.set_data([x_dot], [y_dot])
+    # Positions of dots on the wheel
+    dot.set_data(path_x[:, frame], path_y[:, frame])
 
     # Draw the wheel
-    wheel_center_x = radius * theta[frame]
-    wheel_center_y = radius
-    theta_circle = np.linspace(0, 2 * np.pi, 100)
-    wheel_x = wheel_center_x + radius * np.cos(theta_circle)
-    wheel_y = wheel_center_y + radius * np.sin(theta_circle)
-    wheel.set_data(wheel_x, wheel_y)
-
-    return line, dot, wheel
+    wheel.set_data(radius * theta[frame] + circle_x, circle_y)
 
+    return (*lines, dot, wheel)
 
-# Create animation
-ani = FuncAnimation(fig, update, frames = frame_count, init_func = init, blit = True, interval = 5)
 
 plt.legend(loc = 'upper right')
-plt.show()
\ No newline at end of file
+
+if video_path:
+    # Render every frame into the canvas RGB buffer and pass it straight to the encoder
+    writer = FrameWriter(video_path)
+    init()
+    for frame in range(frame_count):
+        update(frame)
+        fig.canvas.draw()
+        writer.write(np.asarray(fig.canvas.buffer_rgba()))
+    writer.close()
+else:
+    # Create animation
+    ani = FuncAnimation(fig, update, frames = frame_count, init_func = init, blit = True, interval = 5)
+    plt.show()
\ No newline at end of file
@@ -1,5 +1,9 @@
+import sys
+
 import pygame
 import math
+from observables import Observables
+from video import FrameWriter
 
 # Initialize Pygame
 pygame.init()
@@ -39,6 +43,14 @@ radius2 = float(input("Enter radius of the second body: "))
 speed2 = float(input("Enter velocity module of the second body: "))
 angle2 = float(input("Enter velocity angle of the second body (in degrees): "))
 
+# Export renders frames offscreen and streams them to a video file instead of opening a window
+video_path = input("Enter output video file (empty to show the window): ").strip()
+if video_path:
+    export_frames = int(input("Enter the number of frames to export: "))
+    if export_frames <= 0:
+        print("The number of frames to export must be positive")
+        sys.exit(1)
+
 # Convert degrees to radians
 angle1_rad = math.radians(angle1)
 angle2_rad = math.radians(angle2)
@@ -54,9 +66,19 @@ pos2 = [300, 200]
 # Window parameters
 width, height = 700, 500
 
-# Create window
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption("Elastic non-center collision")
+# Observables are sampled every OBSERVE_EVERY steps and saved to OBSERVABLES_FILE.csv/.npz on exit
+OBSERVE_EVERY = 10
+OBSERVABLES_FILE = "observables"
+observables = Observables([mass1, mass2], width, height, every=OBSERVE_EVERY)
+
+if video_path:
+    # Draw into an in-memory surface, the loop runs as fast as the encoder accepts frames
+    screen = pygame.Surface((width, height))
+    writer = FrameWriter(video_path)
+else:
+    # Create window
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Elastic non-center collision")
 
 clock = pygame.time.Clock()
 
@@ -75,22 +97,38 @@ while running:
     pos2[1] += velocity2[1]
 
     # Handle collisions with boundaries
-    for pos, velocity, radius in zip([pos1, pos2], [velocity1, velocity2], [radius1, radius2]):
+    for pos, velocity, radius, mass in zip([pos1, pos2], [velocity1, velocity2], [radius1, radius2], [mass1, mass2]):
+        # A body can stay inside a wall for several steps; only a reflection that turns it back
+        # into the box transfers momentum
         if pos[0] <= radius or pos[0] >= width - radius:
             velocity[0] *= -1
+            if (pos[0] <= radius) == (velocity[0] > 0):
+                observables.add_wall_impulse(2 * mass * abs(velocity[0]))
         if pos[1] <= radius or pos[1] >= height - radius:
             velocity[1] *= -1
+            if (pos[1] <= radius) == (velocity[1] > 0):
+                observables.add_wall_impulse(2 * mass * abs(velocity[1]))
 
     # Handle collisions between bodies
     dist = math.hypot(pos2[0] - pos1[0], pos2[1] - pos1[1])
     if dist <= radius1 + radius2:
         calculate_collision(mass1, mass2, velocity1, velocity2, pos1, pos2)
 
+    observables.step([velocity1, velocity2])
+
     # Draw
     pygame.draw.circle(screen, (255, 0, 0), [int(pos1[0]), int(pos1[1])], int(radius1))
     pygame.draw.circle(screen, (0, 0, 255), [int(pos2[0]), int(pos2[1])], int(radius2))
 
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
\ No newline at end of file
+    if video_path:
+        writer.write(screen)
+        if writer.frame_index >= export_frames:
+            running = False
+    else:
+        pygame.display.flip()
+        clock.tick(60)
+
+if video_path:
+    writer.close()
+pygame.quit()
+observables.export(OBSERVABLES_FILE)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+# Streaming physical observables for the collision simulation
+class Observables:
+    def __init__(self, masses, width, height, every=10, capacity=10000, speed_bins=40, speed_max=None):
+        """
+        Collect energy, momentum, wall pressure and speed histograms every k steps
+
+        :param masses: Masses of the bodies, array of shape (N,)
+        :param width: Width of the box (wall length along x)
+        :param height: Height of the box (wall length along y)
+        :param every: Sampling period k in simulation steps
+        :param capacity: Number of samples kept in the ring buffers (older samples are overwritten)
+        :param speed_bins: Number of bins of the speed histogram
+        :param speed_max: Upper edge of the speed histogram; by default the highest speed allowed by the energy
+                          of the first sample (1 if the bodies are at rest then)
+        """
+        self.masses = np.asarray(masses, dtype=float)
+        self.perimeter = 2 * (width + height)
+        self.every = every
+        self.capacity = capacity
+
+        # Preallocated ring buffers
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.kinetic_energy = np.zeros(capacity)
+        self.momentum = np.zeros((capacity, 2))
+        self.pressure = np.zeros(capacity)
+        self.histograms = np.zeros((capacity, speed_bins), dtype=np.int64)
+
+        # Histogram accumulated over the whole run (for comparison with Maxwell-Boltzmann)
+        self.speed_bins = speed_bins
+        self.speed_max = speed_max
+        self.speed_edges = None
+        self.total_histogram = np.zeros(speed_bins, dtype=np.int64)
+
+        self.step_count = 0
+        self.sample_count = 0
+        self.wall_impulse = 0.0
+
+    def add_wall_impulse(self, impulse):
+        """
+        Register the momentum transferred to a wall by one reflection
+
+        :param impulse: Transferred momentum 2 * m * |v_n|
+        """
+        self.wall_impulse += impulse
+
+    def step(self, velocities):
+        """
+        Advance the step counter and take a sample every k steps
+
+        :param velocities: Velocities of the bodies, array of shape (N, 2)
+        """
+        self.step_count += 1
+        if self.step_count % self.every == 0:
+            self.sample(velocities)
+
+    def sample(self, velocities):
+        velocities = np.asarray(velocities, dtype=float)
+        speeds_squared = np.einsum('ij,ij->i', velocities, velocities)
+        kinetic_energy = 0.5 * np.dot(self.masses, speeds_squared)
+
+        # Speed bins cover every speed allowed by energy conservation
+        if self.speed_edges is None:
+            speed_max = self.speed_max or np.sqrt(2 * kinetic_energy / self.masses.min())
+            # Bodies at rest would give empty bins
+            if not speed_max > 0:
+                speed_max = 1.0
+            self.speed_edges = np.linspace(0, speed_max, self.speed_bins + 1)
+
+        index = self.sample_count % self.capacity
+        self.steps[index] = self.step_count
+        self.kinetic_energy[index] = kinetic_energy
+        self.momentum[index] = self.masses @ velocities
+        # 2D pressure: force per unit length of the walls since the previous sample
+        self.pressure[index] = self.wall_impulse / (self.every * self.perimeter)
+        self.wall_impulse = 0.0
+
+        histogram, _ = np.histogram(np.sqrt(speeds_squared), bins=self.speed_edges)
+        self.histograms[index] = histogram
+        self.total_histogram += histogram
+        self.sample_count += 1
+
+    def _ordered(self, buffer):
+        # Samples from the ring buffer in chronological order
+        if self.sample_count <= self.capacity:
+            return buffer[:self.sample_count]
+        start = self.sample_count % self.capacity
+        return np.concatenate((buffer[start:], buffer[:start]))
+
+    def maxwell_boltzmann(self):
+        """
+        Expected 2D Maxwell-Boltzmann speed density at the histogram bin centers
+
+        The temperature is taken from the mean kinetic energy (kT = <E_k> per body in 2D);
+        for unequal masses the density is the average of the per-body distributions.
+
+        :return: Bin centers and probability density
+        """
+        centers = 0.5 * (self.speed_edges[:-1] + self.speed_edges[1:])
+        kT = self._ordered(self.kinetic_energy).mean() / len(self.masses)
+        m = self.masses[:, np.newaxis]
+        density = (m * centers / kT * np.exp(-m * centers ** 2 / (2 * kT))).mean(axis=0)
+        return centers, density
+
+    def export(self, prefix):
+        """
+        Save the collected samples to <prefix>.csv and <prefix>.npz
+
+        :param prefix: Path without extension
+        """
+        if self.sample_count == 0:
+            return
+        steps = self._ordered(self.steps)
+        kinetic_energy = self._ordered(self.kinetic_energy)
+        momentum = self._ordered(self.momentum)
+        pressure = self._ordered(self.pressure)
+        histograms = self._ordered(self.histograms)
+        centers, density = self.maxwell_boltzmann()
+
+        table = np.column_stack((steps, kinetic_energy, momentum, pressure))
+        np.savetxt(prefix + '.csv', table, delimiter=',', fmt=['%d', '%.10g', '%.10g', '%.10g', '%.10g'],
+                   header='step,kinetic_energy,px,py,pressure', comments='')
+        np.savez(prefix + '.npz', steps=steps, kinetic_energy=kinetic_energy, momentum=momentum,
+                 pressure=pressure, histograms=histograms, speed_edges=self.speed_edges,
+                 total_histogram=self.total_histogram, maxwell_boltzmann=density)
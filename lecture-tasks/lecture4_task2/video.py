@@ -0,0 +1,58 @@
+import os
+import shutil
+import subprocess
+
+import pygame
+
+
+# Streams rendered frames to ffmpeg (or to a PNG sequence) without keeping them in memory
+class FrameWriter:
+    def __init__(self, path, fps=60):
+        """
+        Initialize a frame writer
+
+        :param path: Output video file. Without ffmpeg frames are saved as <name>_000000.png, ...
+        :param fps: Frame rate of the video
+        """
+        self.path = path
+        self.fps = fps
+        self.ffmpeg = shutil.which("ffmpeg")
+        self.process = None
+        self.frame_index = 0
+
+    def _open(self, width, height):
+        # The encoder reads raw RGB frames from stdin; yuv420p needs even frame sizes
+        command = [self.ffmpeg, '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(self.fps),
+                   '-i', '-', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', self.path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, surface):
+        """
+        Write one frame
+
+        :param surface: Pygame surface with the rendered frame
+        """
+        if self.ffmpeg is None:
+            name = f"{os.path.splitext(self.path)[0]}_{self.frame_index:06d}.png"
+            pygame.image.save(surface, name)
+        else:
+            if self.process is None:
+                self._open(*surface.get_size())
+            try:
+                self.process.stdin.write(pygame.image.tobytes(surface, 'RGB'))
+            except BrokenPipeError:
+                # The encoder has exited; close() reports why
+                self.close()
+                raise
+        self.frame_index += 1
+
+    def close(self):
+        if self.process is not None:
+            process, self.process = self.process, None
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg could not write {self.path} (exit code {process.returncode})")
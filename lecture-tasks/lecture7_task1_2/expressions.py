@@ -0,0 +1,183 @@
+import ast
+import copy
+from functools import lru_cache
+from types import SimpleNamespace
+
+import numpy as np
+import sympy
+
+# Functions allowed in force expressions, by name, with their NumPy and SymPy implementations
+FUNCTIONS = {
+    'sin': (np.sin, sympy.sin),
+    'cos': (np.cos, sympy.cos),
+    'tan': (np.tan, sympy.tan),
+    'arcsin': (np.arcsin, sympy.asin),
+    'arccos': (np.arccos, sympy.acos),
+    'arctan': (np.arctan, sympy.atan),
+    'arctan2': (np.arctan2, sympy.atan2),
+    'sinh': (np.sinh, sympy.sinh),
+    'cosh': (np.cosh, sympy.cosh),
+    'tanh': (np.tanh, sympy.tanh),
+    'exp': (np.exp, sympy.exp),
+    'log': (np.log, sympy.log),
+    'sqrt': (np.sqrt, sympy.sqrt),
+    'abs': (np.abs, sympy.Abs),
+    'hypot': (np.hypot, lambda a, b: sympy.sqrt(a ** 2 + b ** 2)),
+}
+CONSTANTS = {
+    'pi': (np.pi, sympy.pi),
+    'e': (np.e, sympy.E),
+}
+VARIABLES = ('x', 'y')
+
+# Largest constant exponent; integer powers are exact in Python and SymPy, so 9**9**9 would never finish
+MAX_EXPONENT = 100
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Attribute, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd,
+)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _namespace(index):
+    # Names visible to an expression: functions and constants directly and as np.<name>
+    names = {name: implementations[index] for name, implementations in {**FUNCTIONS, **CONSTANTS}.items()}
+    return {'__builtins__': {}, 'np': SimpleNamespace(**names), **names}
+
+
+NUMPY_NAMESPACE = _namespace(0)
+SYMPY_NAMESPACE = _namespace(1)
+
+
+def _function_name(node):
+    # Name of a called function, sin(...) or np.sin(...), or None for anything else
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'np':
+        return node.attr
+    return None
+
+
+def _constant_value(node):
+    """
+    Value of a subexpression without x and y, evaluated in floating point, or None if it depends on x or y
+
+    Overflow gives inf instead of an exact (and possibly huge) integer, a complex result such as (-1)**0.5 gives nan.
+    """
+    if any(isinstance(child, ast.Name) and child.id in VARIABLES for child in ast.walk(node)):
+        return None
+
+    class Floats(ast.NodeTransformer):
+        def visit_Constant(self, constant):
+            return ast.Constant(float(constant.value))
+
+    tree = ast.fix_missing_locations(ast.Expression(Floats().visit(copy.deepcopy(node))))
+    code = compile(tree, '<constant>', 'eval')
+    try:
+        with np.errstate(all='ignore'):
+            value = eval(code, NUMPY_NAMESPACE)
+    except OverflowError:
+        return np.inf
+    except ArithmeticError:
+        return np.nan
+    return np.nan if isinstance(value, complex) else float(value)
+
+
+@lru_cache(maxsize=None)
+def _parse(text):
+    """
+    Parse an expression once and check it against the whitelist
+
+    :param text: Expression of x and y, e.g. "-2*x + np.sin(y)"
+    :return: Compiled code object
+    """
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ExpressionError(f"Invalid expression '{text}': {error.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ExpressionError(f"'{type(node).__name__}' is not allowed in expression '{text}'")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Only numeric constants are allowed in expression '{text}'")
+        if isinstance(node, ast.Name) and node.id not in (*VARIABLES, *FUNCTIONS, *CONSTANTS, 'np'):
+            raise ExpressionError(f"Unknown name '{node.id}' in expression '{text}'")
+        if isinstance(node, ast.Attribute) and (
+                not isinstance(node.value, ast.Name) or node.value.id != 'np'
+                or node.attr not in (*FUNCTIONS, *CONSTANTS)):
+            raise ExpressionError(f"Unknown attribute '{ast.unparse(node)}' in expression '{text}'")
+        if isinstance(node, ast.Call) and _function_name(node.func) not in FUNCTIONS:
+            raise ExpressionError(f"'{ast.unparse(node.func)}' is not a function in expression '{text}'")
+    # Functions can only be called, sin or np.sin alone is not a value
+    callees = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if (isinstance(node, (ast.Name, ast.Attribute)) and _function_name(node) in FUNCTIONS
+                and id(node) not in callees):
+            raise ExpressionError(f"Function '{ast.unparse(node)}' must be called in expression '{text}'")
+    # np is only a prefix of functions and constants
+    prefixes = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Attribute)}
+    if any(isinstance(node, ast.Name) and node.id == 'np' and id(node) not in prefixes for node in ast.walk(tree)):
+        raise ExpressionError(f"'np' can only be used as np.<name> in expression '{text}'")
+
+    # The whole tree is whitelisted now, so constant exponents can be evaluated safely
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            exponent = _constant_value(node.right)
+            if exponent is not None and not np.isfinite(exponent):
+                raise ExpressionError(f"Exponent '{ast.unparse(node.right)}' is not a finite real number "
+                                      f"in expression '{text}'")
+            if exponent is not None and abs(exponent) > MAX_EXPONENT:
+                raise ExpressionError(f"Exponent '{ast.unparse(node.right)}' exceeds {MAX_EXPONENT} "
+                                      f"in expression '{text}'")
+            value = _constant_value(node)
+            if value is not None and not np.isfinite(value):
+                raise ExpressionError(f"Constant '{ast.unparse(node)}' is not a finite real number "
+                                      f"in expression '{text}'")
+
+    return compile(tree, '<expression>', 'eval')
+
+
+@lru_cache(maxsize=None)
+def compile_expression(text):
+    """
+    Compile an expression into a vectorized function of x and y
+
+    Compiled functions are cached by the expression text, so repeated calls do not parse again.
+
+    :param text: Expression of x and y
+    :return: Function f(x, y) working on NumPy arrays
+    """
+    code = _parse(text)
+
+    def f(x, y):
+        return eval(code, NUMPY_NAMESPACE, {'x': x, 'y': y})
+
+    return f
+
+
+def symbolic(text):
+    """
+    Convert an expression into a SymPy expression of the symbols x and y
+
+    :param text: Expression of x and y
+    :return: SymPy expression
+    """
+    x, y = sympy.symbols('x y', real=True)
+    return sympy.sympify(eval(_parse(text), SYMPY_NAMESPACE, {'x': x, 'y': y}))
+
+
+def curl(Fx_text, Fy_text):
+    """
+    Analytic curl dFy/dx - dFx/dy of a plane force field, zero for a conservative field
+
+    :param Fx_text: Expression for Fx(x, y)
+    :param Fy_text: Expression for Fy(x, y)
+    :return: Simplified SymPy expression of the curl
+    """
+    x, y = sympy.symbols('x y', real=True)
+    return sympy.simplify(sympy.diff(symbolic(Fy_text), x) - sympy.diff(symbolic(Fx_text), y))
@@ -1,16 +1,73 @@
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.fft import dctn, idctn
+
+from expressions import ExpressionError, compile_expression, curl
 
 # Enter expressions for Fx and Fy from the console
 Fx_expr = input("Enter the expression for Fx(x, y): ")
 Fy_expr = input("Enter the expression for Fy(x, y): ")
 
-# Create functions to calculate Fx and Fy
-def Fx(x, y):
-    return eval(Fx_expr)
+# Method of reconstructing U: integration along a path or least-squares Poisson solution
+method = input("Enter the method for U (path/poisson, empty for path): ").strip().lower() or "path"
+
+# Create functions to calculate Fx and Fy (expressions are parsed and checked only once)
+try:
+    Fx = compile_expression(Fx_expr)
+    Fy = compile_expression(Fy_expr)
+    curl_F = curl(Fx_expr, Fy_expr)
+except ExpressionError as error:
+    print(error)
+    sys.exit(1)
+
+# U(x, y) exists only for a conservative field
+if curl_F != 0:
+    print(f"Warning: the field is not conservative, curl F = {curl_F}; U depends on the integration path")
+
+
+# Cumulative trapezoid integral of f along an axis, starting from zero
+def cumulative_trapezoid(f, step, axis):
+    f = np.moveaxis(f, axis, 0)
+    integral = np.zeros_like(f)
+    np.cumsum((f[1:] + f[:-1]) * (step / 2), axis=0, out=integral[1:])
+    return np.moveaxis(integral, 0, axis)
+
+
+# U = -integral of F·dl along y from the corner (x[0], y[0]), then along x in every row
+def potential_path(Fx_values, Fy_values, dx, dy):
+    U_edge = -cumulative_trapezoid(Fy_values[:, 0], dy, axis=0)
+    return U_edge[:, np.newaxis] - cumulative_trapezoid(Fx_values, dx, axis=1)
+
+
+# U minimizing |grad U + F|^2 over the whole grid, it uses Fx and Fy at every point
+# and does not depend on the integration path (the Neumann Poisson problem is diagonal in the DCT basis)
+def potential_poisson(Fx_values, Fy_values, dx, dy):
+    ny, nx = Fx_values.shape
+
+    # Target gradient between neighbouring nodes: -F at the midpoints
+    gx = -(Fx_values[:, 1:] + Fx_values[:, :-1]) / (2 * dx)
+    gy = -(Fy_values[1:, :] + Fy_values[:-1, :]) / (2 * dy)
+
+    # Divergence of the target gradient (transposed difference operator)
+    rhs = np.zeros((ny, nx))
+    rhs[:, :-1] -= gx
+    rhs[:, 1:] += gx
+    rhs[:-1, :] -= gy
+    rhs[1:, :] += gy
+
+    # Eigenvalues of the discrete Neumann Laplacian
+    kx = (2 - 2 * np.cos(np.pi * np.arange(nx) / nx)) / dx ** 2
+    ky = (2 - 2 * np.cos(np.pi * np.arange(ny) / ny)) / dy ** 2
+    eigenvalues = ky[:, np.newaxis] + kx[np.newaxis, :]
+    eigenvalues[0, 0] = 1.0
+
+    U_hat = dctn(rhs, type=2, norm='ortho') / eigenvalues
+    U_hat[0, 0] = 0.0
+    U = idctn(U_hat, type=2, norm='ortho')
+    return U - U[0, 0]
 
-def Fy(x, y):
-    return eval(Fy_expr)
 
 # Create a grid of x and y values
 x = np.linspace(-5, 5, 200)
@@ -18,22 +75,18 @@ y = np.linspace(-5, 5, 200)
 X, Y = np.meshgrid(x, y)
 
 # Calculate Fx and Fy on a grid
-Fx_values = Fx(X, Y)
-Fy_values = Fy(X, Y)
-
-# Initialization of potential energy U
-U = np.zeros_like(X)
+Fx_values = np.broadcast_to(Fx(X, Y), X.shape)
+Fy_values = np.broadcast_to(Fy(X, Y), Y.shape)
 
 # Steps in x and y
 dx = x[1] - x[0]
 dy = y[1] - y[0]
 
 # Calculate potential energy U(x, y)
-# Integrate the force along the x and y axes
-for i in range(1, X.shape[0]):
-    U[i, 0] = U[i-1, 0] - Fx_values[i-1, 0] * dx
-for j in range(1, Y.shape[1]):
-    U[:, j] = U[:, j-1] - Fy_values[:, j-1] * dy
+if method == "poisson":
+    U = potential_poisson(Fx_values, Fy_values, dx, dy)
+else:
+    U = potential_path(Fx_values, Fy_values, dx, dy)
 
 # Visualization of potential field U(x, y)
 plt.figure(figsize=(8, 6))
@@ -1,6 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from oscillator import (CRITICAL, OVERDAMPED, UNDERDAMPED, Spectrum, damping_regime, energies, forced_oscillate,
+                        oscillate, resonance_curve)
+
+REGIME_NAMES = {UNDERDAMPED: "underdamped", CRITICAL: "critically damped", OVERDAMPED: "overdamped"}
+
 # Input data
 m = float(input("Enter the weight of the load (kg): "))
 k = float(input("Enter spring stiffness coefficient (N/m): "))
@@ -10,36 +15,29 @@ b = float(input("Enter the resistance coefficient of the medium (N*s/m): "))
 x0 = 1.0  # initial offset (m)
 v0 = 0.0  # initial speed (m/s)
 
+# Optional driving force F0 cos(omega t)
+forced = input("Add a driving force F0*cos(omega*t)? (yes/no): ").strip().lower() == "yes"
+if forced:
+    F0 = float(input("Enter the driving force amplitude F0 (N): "))
+    omega = float(input("Enter the driving angular frequency omega (rad/s): "))
+
 # Time parameters
 t_max = 20  # maximum time (s)
 dt = 0.01  # time step (s)
+if forced:
+    # A longer record gives a finer spectrum (resolution 2*pi/t_max rad/s)
+    t_max = float(input("Enter the simulation time (s): ") or 100)
 t = np.arange(0, t_max, dt)  # time grid
 
-
-# Function for calculating positions and velocities
-def oscillate(m, k, b, x0, v0, t):
-    # The principle of solving a differential equation
-    omega0 = np.sqrt(k / m)
-    gamma = b / (2 * m)
-    omega_d = np.sqrt(omega0 ** 2 - gamma ** 2)
-
-    A = x0
-    B = (v0 + gamma * x0) / omega_d
-
-    # Damped harmonic oscillations
-    x = np.exp(-gamma * t) * (A * np.cos(omega_d * t) + B * np.sin(omega_d * t))
-    v = np.gradient(x, dt)
-
-    return x, v
-
-
-# Calculating positions and velocities
-x, v = oscillate(m, k, b, x0, v0, t)
+# Calculating exact positions and velocities for the damping regime of the load
+if forced:
+    x, v = forced_oscillate(m, k, b, x0, v0, F0, omega, t)
+else:
+    x, v = oscillate(m, k, b, x0, v0, t)
+print(f"Damping regime: {REGIME_NAMES[int(damping_regime(m, k, b))]}")
 
 # Energies
-kinetic_energy = 0.5 * m * v ** 2
-potential_energy = 0.5 * k * x ** 2
-total_energy = kinetic_energy + potential_energy
+kinetic_energy, potential_energy, total_energy = energies(m, k, x, v)
 
 # Plot graphs
 plt.figure(figsize=(12, 8))
@@ -55,4 +53,39 @@ plt.legend()
 plt.grid(True)
 plt.tight_layout()
 
+if forced:
+    # Resonance curve of the load and spectrum of the simulated motion
+    omega0 = np.sqrt(k / m)
+    omega_grid = np.linspace(0, 3 * max(omega0, omega), 2000)
+    amplitude, phase = resonance_curve(m, k, b, omega_grid, F0)
+    steady_amplitude, _ = resonance_curve(m, k, b, [omega], F0)
+    print(f"Steady-state amplitude at omega = {omega:.3f} rad/s: {steady_amplitude[0]:.4e} m")
+
+    spectrum = Spectrum(len(t), dt)
+    spectrum_amplitude = spectrum(x)
+
+    fig, (ax_curve, ax_phase, ax_spectrum) = plt.subplots(3, 1, figsize=(12, 10))
+    ax_curve.plot(omega_grid, amplitude, color='b')
+    ax_curve.axvline(omega, color='r', linestyle='--', label='Driving frequency')
+    ax_curve.axvline(omega0, color='g', linestyle=':', label='Natural frequency')
+    ax_curve.set_title('Resonance curve')
+    ax_curve.set_ylabel('Amplitude (m)')
+    ax_curve.legend()
+    ax_curve.grid(True)
+
+    ax_phase.plot(omega_grid, np.degrees(phase), color='b')
+    ax_phase.set_ylabel('Phase lag (deg)')
+    ax_phase.set_xlabel('Angular frequency (rad/s)')
+    ax_phase.grid(True)
+
+    visible = spectrum.omega <= omega_grid[-1]
+    ax_spectrum.semilogy(spectrum.omega[visible], spectrum_amplitude[visible], color='b')
+    ax_spectrum.axvline(omega, color='r', linestyle='--')
+    ax_spectrum.axvline(omega0, color='g', linestyle=':')
+    ax_spectrum.set_title('Spectrum of x(t)')
+    ax_spectrum.set_xlabel('Angular frequency (rad/s)')
+    ax_spectrum.set_ylabel('Amplitude (m)')
+    ax_spectrum.grid(True)
+    fig.tight_layout()
+
 plt.show()
\ No newline at end of file
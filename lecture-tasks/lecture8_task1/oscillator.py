@@ -0,0 +1,223 @@
+import numpy as np
+
+# Damping regimes returned by damping_regime
+UNDERDAMPED = 0
+CRITICAL = 1
+OVERDAMPED = 2
+
+# Relative tolerance on gamma^2 - omega0^2 for treating damping as critical
+CRITICAL_TOLERANCE = 1e-12
+
+
+def damping_regime(m, k, b):
+    """
+    Classify oscillators by damping.
+
+    :param m: masses (kg)
+    :param k: spring stiffness coefficients (N/m)
+    :param b: resistance coefficients of the medium (N*s/m)
+    :return: array of UNDERDAMPED, CRITICAL or OVERDAMPED (broadcast shape of the arguments)
+    """
+    m, k, b = np.broadcast_arrays(np.asarray(m, dtype=float), np.asarray(k, dtype=float),
+                                  np.asarray(b, dtype=float))
+    gamma2 = (b / (2 * m)) ** 2
+    omega02 = k / m
+    discriminant = gamma2 - omega02
+    regime = np.where(discriminant > 0, OVERDAMPED, UNDERDAMPED)
+    critical = np.abs(discriminant) <= CRITICAL_TOLERANCE * np.maximum(gamma2, omega02)
+    return np.where(critical, CRITICAL, regime)
+
+
+def oscillate(m, k, b, x0, v0, t):
+    """
+    Exact positions and velocities of free damped oscillators m x'' + b x' + k x = 0.
+
+    The closed form is chosen per oscillator: underdamped (decaying cosine and sine),
+    critically damped ((A + B t) e^(-gamma t)) or overdamped (sum of two exponentials).
+    The velocity is the derivative of the same closed form, not a finite difference.
+
+    :param m: masses (kg)
+    :param k: spring stiffness coefficients (N/m)
+    :param b: resistance coefficients of the medium (N*s/m)
+    :param x0: initial offsets (m)
+    :param v0: initial speeds (m/s)
+    :param t: 1D time grid (s)
+    :return: x, v with shape (batch..., len(t)), where batch is the broadcast shape of m, k, b, x0, v0
+    """
+    m, k, b, x0, v0 = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (m, k, b, x0, v0)))
+    t = np.asarray(t, dtype=float)
+    shape = m.shape
+
+    # One row per oscillator
+    m, k, b, x0, v0 = (value.ravel() for value in (m, k, b, x0, v0))
+    x = np.empty((m.size, t.size))
+    v = np.empty((m.size, t.size))
+
+    gamma = b / (2 * m)
+    omega02 = k / m
+    regime = damping_regime(m, k, b)
+
+    # Underdamped: x = e^(-gamma t) (A cos(omega_d t) + B sin(omega_d t))
+    lanes = regime == UNDERDAMPED
+    if lanes.any():
+        g = gamma[lanes, np.newaxis]
+        omega_d = np.sqrt(omega02[lanes] - gamma[lanes] ** 2)[:, np.newaxis]
+        A = x0[lanes, np.newaxis]
+        B = (v0[lanes, np.newaxis] + g * A) / omega_d
+        decay = np.exp(-g * t)
+        cos = np.cos(omega_d * t)
+        sin = np.sin(omega_d * t)
+        x[lanes] = decay * (A * cos + B * sin)
+        v[lanes] = decay * ((B * omega_d - g * A) * cos - (A * omega_d + g * B) * sin)
+
+    # Critical: x = e^(-gamma t) (A + B t)
+    lanes = regime == CRITICAL
+    if lanes.any():
+        g = gamma[lanes, np.newaxis]
+        A = x0[lanes, np.newaxis]
+        B = v0[lanes, np.newaxis] + g * A
+        decay = np.exp(-g * t)
+        x[lanes] = decay * (A + B * t)
+        v[lanes] = decay * (B - g * (A + B * t))
+
+    # Overdamped: x = C1 e^(r1 t) + C2 e^(r2 t) with real roots r1 > r2
+    lanes = regime == OVERDAMPED
+    if lanes.any():
+        g = gamma[lanes]
+        s = np.sqrt(g ** 2 - omega02[lanes])
+        # r1 = -gamma + s loses precision for strong damping, use r1 * r2 = omega0^2 instead
+        r2 = (-g - s)[:, np.newaxis]
+        r1 = (-omega02[lanes] / (g + s))[:, np.newaxis]
+        C1 = (v0[lanes, np.newaxis] - r2 * x0[lanes, np.newaxis]) / (r1 - r2)
+        C2 = x0[lanes, np.newaxis] - C1
+        e1 = np.exp(r1 * t)
+        e2 = np.exp(r2 * t)
+        x[lanes] = C1 * e1 + C2 * e2
+        v[lanes] = C1 * r1 * e1 + C2 * r2 * e2
+
+    return x.reshape(shape + t.shape), v.reshape(shape + t.shape)
+
+
+def energies(m, k, x, v):
+    """
+    Kinetic, potential and total mechanical energy for positions and velocities from oscillate.
+
+    :param m: masses (kg), shape of the oscillator batch
+    :param k: spring stiffness coefficients (N/m), shape of the oscillator batch
+    :param x: positions (batch..., time)
+    :param v: velocities (batch..., time)
+    :return: kinetic, potential and total energy (J) with the shape of x
+    """
+    m = np.asarray(m, dtype=float)[..., np.newaxis]
+    k = np.asarray(k, dtype=float)[..., np.newaxis]
+    kinetic_energy = 0.5 * m * v ** 2
+    potential_energy = 0.5 * k * x ** 2
+    return kinetic_energy, potential_energy, kinetic_energy + potential_energy
+
+
+def resonance_curve(m, k, b, omega, F0=1.0):
+    """
+    Steady-state amplitude and phase lag of oscillators driven by F0 cos(omega t).
+
+    :param m: masses (kg), any batch shape
+    :param k: spring stiffness coefficients (N/m), same batch shape
+    :param b: resistance coefficients of the medium (N*s/m), same batch shape
+    :param omega: 1D grid of driving angular frequencies (rad/s)
+    :param F0: driving force amplitude (N)
+    :return: amplitude (m) and phase lag (rad, from 0 to pi) with shape (batch..., len(omega));
+             an undamped oscillator driven exactly at omega0 has an infinite amplitude
+    """
+    m, k, b = np.broadcast_arrays(np.asarray(m, dtype=float), np.asarray(k, dtype=float),
+                                  np.asarray(b, dtype=float))
+    omega = np.asarray(omega, dtype=float)
+    omega02 = (k / m)[..., np.newaxis]
+    two_gamma = (b / m)[..., np.newaxis]
+
+    # x = A cos(omega t - phi), A = F0/m / sqrt((omega0^2 - omega^2)^2 + (2 gamma omega)^2)
+    detuning = omega02 - omega ** 2
+    friction = two_gamma * omega
+    with np.errstate(divide='ignore'):
+        amplitude = F0 / m[..., np.newaxis] / np.hypot(detuning, friction)
+    phase = np.arctan2(friction, detuning)
+    return amplitude, phase
+
+
+def forced_oscillate(m, k, b, x0, v0, F0, omega, t):
+    """
+    Exact motion of oscillators driven by F0 cos(omega t).
+
+    The solution is the steady-state response plus a free oscillation (see oscillate)
+    that brings the initial conditions to x0, v0. An undamped oscillator driven exactly
+    at resonance uses the secular solution F0/(2 m omega0) t sin(omega0 t).
+
+    :param m: masses (kg)
+    :param k: spring stiffness coefficients (N/m)
+    :param b: resistance coefficients of the medium (N*s/m)
+    :param x0: initial offsets (m)
+    :param v0: initial speeds (m/s)
+    :param F0: driving force amplitudes (N)
+    :param omega: driving angular frequencies (rad/s)
+    :param t: 1D time grid (s)
+    :return: x, v with shape (batch..., len(t))
+    """
+    m, k, b, x0, v0, F0, omega = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (m, k, b, x0, v0, F0, omega)))
+    t = np.asarray(t, dtype=float)
+    w = omega[..., np.newaxis]
+
+    omega02 = k / m
+    detuning = omega02 - omega ** 2
+    friction = b / m * omega
+    resonant = (b == 0) & (detuning == 0)
+
+    # Steady state, with the resonant lanes masked out of the division
+    norm = np.where(resonant, 1.0, np.hypot(detuning, friction))
+    amplitude = np.where(resonant, 0.0, F0 / m / norm)[..., np.newaxis]
+    phase = np.arctan2(friction, detuning)[..., np.newaxis]
+    x_steady = amplitude * np.cos(w * t - phase)
+    v_steady = -amplitude * w * np.sin(w * t - phase)
+
+    # Secular growth at undamped resonance: starts from x = 0, v = 0
+    growth = np.where(resonant, F0 / (2 * m * np.where(resonant, omega, 1.0)), 0.0)[..., np.newaxis]
+    x_steady = x_steady + growth * t * np.sin(w * t)
+    v_steady = v_steady + growth * (np.sin(w * t) + w * t * np.cos(w * t))
+
+    # Free oscillation matching the initial conditions
+    amplitude, phase = amplitude[..., 0], phase[..., 0]
+    x_free, v_free = oscillate(m, k, b, x0 - amplitude * np.cos(phase), v0 - amplitude * omega * np.sin(phase), t)
+    return x_steady + x_free, v_steady + v_free
+
+
+class Spectrum:
+    def __init__(self, n, dt, batch=()):
+        """
+        Amplitude spectrum of signals of n samples with step dt, computed by a real FFT.
+
+        The Hann window and all work arrays are allocated once, so repeated calls
+        for signals of the same shape do not allocate.
+
+        :param n: number of samples per signal
+        :param dt: time step (s)
+        :param batch: leading shape of the signals, e.g. (number of oscillators,)
+        """
+        self.window = np.hanning(n)
+        # Scale so that a sine of amplitude A gives a peak of height A
+        self.scale = 2.0 / self.window.sum()
+        self.omega = 2 * np.pi * np.fft.rfftfreq(n, dt)
+        self.buffer = np.empty(tuple(batch) + (n,))
+        self.transform = np.empty(tuple(batch) + (n // 2 + 1,), dtype=complex)
+        self.amplitude = np.empty(tuple(batch) + (n // 2 + 1,))
+
+    def __call__(self, x):
+        """
+        :param x: signals with shape batch + (n,)
+        :return: amplitude spectrum with shape batch + (n // 2 + 1,) over the angular frequencies self.omega;
+                 the returned array is reused by the next call
+        """
+        # Remove the mean so that the offset does not leak into low frequencies
+        np.subtract(x, np.mean(x, axis=-1, keepdims=True), out=self.buffer)
+        np.multiply(self.buffer, self.window, out=self.buffer)
+        np.fft.rfft(self.buffer, axis=-1, out=self.transform)
+        np.abs(self.transform, out=self.amplitude)
+        self.amplitude *= self.scale
+        return self.amplitude
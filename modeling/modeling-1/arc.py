@@ -0,0 +1,222 @@
+import numpy as np
+
+g = 9.81  # m/s^2
+
+# Outcome of the motion along the arc
+PASSED = 0   # the body reached the end of the arc
+LIFTOFF = 1  # the normal force dropped to zero, the body left the arc
+STOPPED = 2  # the body stopped on the arc and slides back
+
+# What ends the flight
+GROUND = 0  # the body lands on the horizontal plane y = 0
+ARC = 1     # the body hits the arc again
+
+
+def _arc_profile(R, mu, alpha, steps):
+    """
+    Part of the RK4 solution on the arc that does not depend on the entrance speed.
+
+    One RK4 step of the linear equation for u = v^2 is u[n+1] = A u[n] + b[n], so
+    u[n] = A^n u0 + offset[n]; all steps of all lanes are evaluated at once with
+    a cumulative sum instead of a Python loop over steps.
+
+    :param R, mu, alpha: column arrays of shape (lanes, 1)
+    :return: theta, A^n, offset and g cos(theta), each of shape (lanes, steps + 1)
+    """
+    h = alpha / steps
+    n = np.arange(steps + 1)
+    theta = h * n
+
+    # Forcing term f(theta) = 2 g R (sin(theta) + mu cos(theta)) at the nodes and the midpoints
+    forcing = 2 * g * R * (np.sin(theta) + mu * np.cos(theta))
+    forcing_half = 2 * g * R * (np.sin(theta[:, :-1] + h / 2) + mu * np.cos(theta[:, :-1] + h / 2))
+
+    # RK4 for u' = a u - f with z = a h:
+    # u[n+1] = A u[n] - h/6 ((1 + z + z^2/2 + z^3/4) f[n] + (4 + 2z + z^2/2) f[n+1/2] + f[n+1])
+    z = -2 * mu * h
+    A = 1 + z + z ** 2 / 2 + z ** 3 / 6 + z ** 4 / 24
+    b = -h / 6 * ((1 + z + z ** 2 / 2 + z ** 3 / 4) * forcing[:, :-1] + (4 + 2 * z + z ** 2 / 2) * forcing_half
+                  + forcing[:, 1:])
+
+    # offset[n] = A^n sum_{k<n} b[k] A^-(k+1)
+    power = A ** n
+    offset = np.zeros_like(power)
+    np.cumsum(b / power[:, 1:], axis=1, out=offset[:, 1:])
+    offset *= power
+    return theta, power, offset, g * np.cos(theta)
+
+
+def arc_motion(R, mu, alpha, v0, steps=1000, record=False):
+    """
+    Motion of a body along the inside of a vertical arc with friction mu * N.
+
+    The arc starts at the bottom of the ring, the angle theta is measured from the bottom,
+    so the body is at x = R sin(theta), y = R (1 - cos(theta)). The friction uses the actual
+    normal force N / m = v^2 / R + g cos(theta), so the square of the speed u = v^2 obeys
+        du/dtheta = -2 mu u - 2 g R (sin(theta) + mu cos(theta)).
+    It is integrated over theta with the Runge-Kutta 4 method for all lanes at once
+    (see _arc_profile). The first event of every lane is then located by linear
+    interpolation: lift-off (N = 0), stop (v = 0) or the end of the arc (theta = alpha).
+
+    :param R: ring radius (m)
+    :param mu: friction coefficient
+    :param alpha: angular size of the arc (rad)
+    :param v0: speed at the entrance to the arc (m/s)
+    :param steps: number of integration steps over the arc
+    :param record: also return the angle and the speed over the arc
+    :return: dictionary of arrays with the broadcast shape of the arguments:
+             status (PASSED, LIFTOFF or STOPPED), theta (angle of the event), v (speed there);
+             with record=True also path_theta and path_v of shape (..., steps + 1),
+             where the values after the event repeat the event
+    """
+    R, mu, alpha, v0 = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (R, mu, alpha, v0)))
+    shape = R.shape
+    R, mu, alpha, v0 = (value.ravel()[:, np.newaxis] for value in (R, mu, alpha, v0))
+
+    h = alpha / steps
+    n = np.arange(steps + 1)
+    theta, power, offset, gravity = _arc_profile(R, mu, alpha, steps)
+    u = power * v0 ** 2 + offset
+
+    # First step at whose end N <= 0 or u <= 0
+    normal = u / R + gravity
+    event = (normal[:, 1:] <= 0) | (u[:, 1:] <= 0)
+    has_event = event.any(axis=1)
+    # Lanes without events end in the last step
+    first = np.where(has_event, np.argmax(event, axis=1), steps - 1)[:, np.newaxis]
+
+    def at(values, offset):
+        return np.take_along_axis(values, first + offset, axis=1)[:, 0]
+
+    lifted = has_event & (at(normal, 1) <= 0)
+    stopped = has_event & ~lifted
+    before = np.where(lifted, at(normal, 0), at(u, 0))
+    after = np.where(lifted, at(normal, 1), at(u, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(has_event, before / (before - after), 1.0)
+
+    event_theta = (first[:, 0] + fraction) * h[:, 0]
+    event_u = np.maximum(at(u, 0) + fraction * (at(u, 1) - at(u, 0)), 0.0)
+    status = np.where(lifted, LIFTOFF, np.where(stopped, STOPPED, PASSED))
+
+    result = {"status": status.reshape(shape), "theta": event_theta.reshape(shape),
+              "v": np.sqrt(event_u).reshape(shape)}
+    if record:
+        after_event = has_event[:, np.newaxis] & (n > first)
+        path_theta = np.where(after_event, event_theta[:, np.newaxis], theta)
+        path_u = np.where(after_event, event_u[:, np.newaxis], u)
+        result["path_theta"] = path_theta.reshape(shape + (steps + 1,))
+        result["path_v"] = np.sqrt(np.maximum(path_u, 0.0)).reshape(shape + (steps + 1,))
+    return result
+
+
+def flight(R, alpha, theta, v, samples=400, refine=40):
+    """
+    Free flight after the body leaves the arc at the angle theta with speed v along the tangent.
+
+    The flight ends on the horizontal plane y = 0 or when the body crosses the ring
+    at a point that belongs to the arc (0 <= angle <= alpha). The crossing is found
+    on a grid of samples up to the landing time and refined by bisection.
+
+    :param R: ring radius (m)
+    :param alpha: angular size of the arc (rad)
+    :param theta: angle at which the body leaves the arc (rad)
+    :param v: speed at that point (m/s)
+    :param samples: number of time samples used to find the first crossing
+    :param refine: number of bisection steps for the crossing time
+    :return: dictionary of arrays with the broadcast shape of the arguments:
+             event (GROUND or ARC), t (flight time), x, y (point of impact),
+             x0, y0, vx, vy (start of the flight)
+    """
+    R, alpha, theta, v = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (R, alpha, theta, v)))
+    x0 = R * np.sin(theta)
+    y0 = R * (1 - np.cos(theta))
+    vx = v * np.cos(theta)
+    vy = v * np.sin(theta)
+
+    # Landing on the plane: y0 + vy t - g t^2 / 2 = 0
+    t_ground = (vy + np.sqrt(vy ** 2 + 2 * g * y0)) / g
+
+    def position(t):
+        return x0[..., np.newaxis] + vx[..., np.newaxis] * t, \
+            y0[..., np.newaxis] + vy[..., np.newaxis] * t - 0.5 * g * t ** 2
+
+    def outside(t):
+        # Squared distance from the centre of the ring (0, R) minus R^2
+        x, y = position(t)
+        return x ** 2 + (y - R[..., np.newaxis]) ** 2 - R[..., np.newaxis] ** 2
+
+    def on_arc(t):
+        x, y = position(t)
+        angle = np.mod(np.arctan2(x, R[..., np.newaxis] - y), 2 * np.pi)
+        return angle <= alpha[..., np.newaxis]
+
+    # The flight starts on the ring, so the first sample is skipped
+    t = t_ground[..., np.newaxis] * np.linspace(0, 1, samples + 1)[1:]
+    side = np.sign(outside(t))
+    crossed = (side[..., 1:] != side[..., :-1]) & on_arc(t[..., 1:])
+    hit = crossed.any(axis=-1)
+    first = np.argmax(crossed, axis=-1)[..., np.newaxis]
+
+    # Bisection of the crossing inside the sample interval
+    lo = np.take_along_axis(t, first, axis=-1)
+    hi = np.take_along_axis(t, first + 1, axis=-1)
+    lo_side = np.take_along_axis(side, first, axis=-1)
+    for _ in range(refine):
+        middle = 0.5 * (lo + hi)
+        same = np.sign(outside(middle)) == lo_side
+        lo = np.where(same, middle, lo)
+        hi = np.where(same, hi, middle)
+
+    t_end = np.where(hit, hi[..., 0], t_ground)
+    x, y = position(t_end[..., np.newaxis])
+    return {"event": np.where(hit, ARC, GROUND), "t": t_end, "x": x[..., 0], "y": np.maximum(y[..., 0], 0.0),
+            "x0": x0, "y0": y0, "vx": vx, "vy": vy}
+
+
+def minimal_speed(R, mu, alpha, tol=1e-6, steps=1000, chunk=256):
+    """
+    Minimal entrance speed for which the body passes the whole arc, found by bisection.
+
+    All combinations of the arguments (broadcast against each other) are searched together
+    in chunks of lanes. The speed-independent part of the arc solution is computed once per
+    chunk, so a bisection step only rescales it for the new speed and checks N > 0, v > 0.
+
+    :param R: ring radius (m)
+    :param mu: friction coefficient
+    :param alpha: angular size of the arc (rad)
+    :param tol: relative tolerance on the speed
+    :param steps: number of integration steps over the arc
+    :param chunk: number of lanes solved together
+    :return: minimal speed (m/s) with the broadcast shape of the arguments
+    """
+    R, mu, alpha = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (R, mu, alpha)))
+    shape = R.shape
+    R, mu, alpha = (value.ravel()[:, np.newaxis] for value in (R, mu, alpha))
+    speed = np.empty(R.shape[0])
+
+    for start in range(0, R.shape[0], chunk):
+        lanes = slice(start, start + chunk)
+        r = R[lanes]
+        theta, power, offset, gravity = _arc_profile(r, mu[lanes], alpha[lanes], steps)
+
+        def passes(v0):
+            u = power[:, 1:] * v0[:, np.newaxis] ** 2 + offset[:, 1:]
+            return np.all((u > 0) & (u / r + gravity[:, 1:] > 0), axis=1)
+
+        # Upper bound: the speed needed for a full frictionless loop, doubled until every arc is passed
+        lo = np.zeros(r.shape[0])
+        hi = np.sqrt(5 * g * r[:, 0])
+        failed = ~passes(hi)
+        while failed.any():
+            lo = np.where(failed, hi, lo)
+            hi = np.where(failed, 2 * hi, hi)
+            failed = ~passes(hi)
+
+        while np.any(hi - lo > tol * hi):
+            middle = 0.5 * (lo + hi)
+            passed = passes(middle)
+            lo = np.where(passed, lo, middle)
+            hi = np.where(passed, middle, hi)
+        speed[lanes] = hi
+    return speed.reshape(shape)
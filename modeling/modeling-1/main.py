@@ -1,51 +1,54 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from arc import ARC, g, arc_motion, flight, minimal_speed
+
 # Data
-g = 9.81  # m/s^2
 R = 3.0  # m
 mu = 0.01
 alpha = (7 * np.pi) / 6  # rad
 
-# Calculate initial velocity
-v0_squared = R * (2 * g - g * np.cos(alpha) + 2 * mu * g * alpha)
-v0 = np.sqrt(v0_squared)
-
-# Check the value under the root for v(α)
-v_alpha_squared = v0_squared - 2 * g * R * (1 - np.cos(alpha)) - 2 * mu * g * R * alpha
-
-# Since v_alpha_squared can be negative due to energy losses, we use the modulus
-v_alpha = np.sqrt(abs(v_alpha_squared))
+# Minimal initial velocity: friction depends on the actual normal force, so it is found numerically
+v0 = minimal_speed(R, mu, alpha)
+print(f"Minimal velocity to pass the whole arc: v0 = {v0:.3f} m/s")
 
-# Angles for arc constructing
-theta = np.linspace(0, alpha, 100)
+# Motion along the arc
+motion = arc_motion(R, mu, alpha, v0, record=True)
+theta = motion["path_theta"]
 x_arc = R * np.sin(theta)
 y_arc = R * (1 - np.cos(theta))
+v_alpha = motion["v"]
+print(f"Velocity at the end of the arc: v = {v_alpha:.3f} m/s")
 
-# lift-off point
-x0 = R * np.sin(alpha)
-y0 = R * (1 - np.cos(alpha))
-
-# Tangent angle at lift-off point
-phi = alpha + np.pi / 2
-vx = -v_alpha * np.cos(phi)
-vy = v_alpha * np.sin(phi)
-
-# Flight time after lift-off
-t = np.linspace(0, 0.72, 100)  # time can be adjusted
-
-# Trajectory after lift-off
-x_flight = x0 + vx * t
-y_flight = y0 + vy * t - 0.5 * g * t**2
+# Flight after leaving the arc until the body hits the plane or the arc
+jump = flight(R, alpha, motion["theta"], v_alpha)
+t = np.linspace(0, jump["t"], 100)
+x_flight = jump["x0"] + jump["vx"] * t
+y_flight = jump["y0"] + jump["vy"] * t - 0.5 * g * t ** 2
+target = "the arc" if jump["event"] == ARC else "the plane"
+print(f"Flight time: {jump['t']:.3f} s, lands on {target} at x = {jump['x']:.3f} m, y = {jump['y']:.3f} m")
 
 # Plot a graph
 plt.figure(figsize=(10, 6))
 plt.plot(x_arc, y_arc, label='Movement in the arc')
 plt.plot(x_flight, y_flight, label='Movement after leaving the arc')
+plt.plot(jump["x"], jump["y"], 'ko', label='Landing point')
 plt.title("Trajectory of the body's motion along the arc and after leaving the arc")
 plt.xlabel('x, m')
 plt.ylabel('y, m')
 plt.legend()
 plt.grid(True)
 plt.axis('equal')
-plt.show()
\ No newline at end of file
+
+# Minimal velocity for a grid of arc sizes and friction coefficients in one batched run
+alphas = np.linspace(np.pi / 2, 3 * np.pi / 2, 100)
+mus = np.linspace(0, 0.5, 100)
+v_min = minimal_speed(R, mus[np.newaxis, :], alphas[:, np.newaxis])
+
+plt.figure(figsize=(10, 6))
+mesh = plt.pcolormesh(mus, np.degrees(alphas), v_min, shading='auto', cmap='viridis')
+plt.colorbar(mesh, label='v0, m/s')
+plt.title(f'Minimal velocity to pass the arc, R = {R} m')
+plt.xlabel('Friction coefficient μ')
+plt.ylabel('Arc size α, deg')
+plt.show()
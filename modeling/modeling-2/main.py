@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from tracer import CylindricalCapacitor, boris_push
+
 # Problem constants
 r = 0.06       # inner radius in meters
 R = 0.13       # outer radius in meters
@@ -53,38 +55,17 @@ def motion_plots(r, R, L, Vx, e, m):
     dt = t_total / N
     t_vals = np.linspace(0, t_total, N + 1)
 
-    # Arrays for y(t) position, y velocity, and y acceleration
-    y_vals = np.zeros(N + 1)
-    vy_vals = np.zeros(N + 1)
-    ay_vals = np.zeros(N + 1)
-
-    # Initial conditions
-    y_vals[0] = 0.0     # starts in the middle
-    vy_vals[0] = 0.0    # no initial y-velocity
-
     # Electric field in the radial direction for a cylindrical capacitor
-    # E(rho) = [phi_min / ln(R/r)] * (1 / rho)
-    def E_rho(rho):
-        return (phi_min / np.log(R / r)) * (1.0 / rho)
-
-    # Numerical integration (Euler method for simplicity)
-    for i in range(N):
-        # Current radius from the cylinder axis
-        rho_i = (r + R) / 2 + y_vals[i]
-
-        # a_y = (e/m)*E(rho_i)
-        ay_vals[i] = (e / m) * E_rho(rho_i)
-
-        # Update velocity and position
-        vy_vals[i + 1] = vy_vals[i] + ay_vals[i] * dt
-        y_vals[i + 1] = y_vals[i] + vy_vals[i + 1] * dt
-
-    # Compute acceleration for the final point
-    rho_end = (r + R) / 2 + y_vals[-1]
-    ay_vals[-1] = (e / m) * E_rho(rho_end)
-
-    # x(t) evolves uniformly (ignoring any deflection in x):
-    x_vals = Vx * t_vals
+    # E(rho) = [phi_min / ln(R/r)] * (1 / rho), the axis lies (r + R) / 2 below the electron.
+    # The inner plate is at the lower potential, so the field pushes the electron outwards.
+    capacitor = CylindricalCapacitor(r, R, -phi_min, axis=(-(r + R) / 2, 0.0))
+
+    # Numerical integration (Boris / velocity Verlet scheme)
+    result = boris_push(np.zeros((1, 3)), [[Vx, 0.0, 0.0]], -e / m, capacitor, dt, N, record_every=1)
+    x_vals = result["trajectory"][:, 0, 0]
+    y_vals = result["trajectory"][:, 0, 1]
+    vy_vals = result["trajectory_velocity"][:, 0, 1]
+    ay_vals = -e / m * capacitor(result["trajectory"][:, 0])[:, 1]
 
     # --- Plotting ---
     fig, axs = plt.subplots(2, 2, figsize=(12, 10))
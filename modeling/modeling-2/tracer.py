@@ -0,0 +1,228 @@
+import time
+
+import numpy as np
+
+# Coulomb constant, N*m^2/C^2
+k = 8.9875517923e9
+
+
+# -----------------------------------------------------------------------------
+# Electric fields: callables mapping positions (N, 3) to field vectors (N, 3)
+# -----------------------------------------------------------------------------
+class CylindricalCapacitor:
+    def __init__(self, r, R, U, axis=(0.0, 0.0)):
+        """
+        Field between the plates of a cylindrical capacitor, edge effects neglected.
+
+        The cylinder axis is parallel to x and passes through the point axis = (y, z).
+        U is the potential of the inner plate relative to the outer one, so
+        E_rho(rho) = U / (ln(R/r) * rho), directed away from the axis for U > 0.
+        """
+        self.r = r
+        self.R = R
+        self.U = U
+        self.axis = np.asarray(axis, dtype=float)
+
+    def __call__(self, positions):
+        d = positions[:, 1:] - self.axis
+        rho2 = np.einsum('ij,ij->i', d, d)
+        # E_rho * (d / rho) = U / ln(R/r) * d / rho^2
+        scale = self.U / np.log(self.R / self.r) / rho2
+        field = np.zeros_like(positions)
+        field[:, 1:] = d * scale[:, np.newaxis]
+        return field
+
+    def absorbed(self, positions):
+        """
+        True for particles that reached one of the plates.
+        """
+        d = positions[:, 1:] - self.axis
+        rho = np.sqrt(np.einsum('ij,ij->i', d, d))
+        return (rho <= self.r) | (rho >= self.R)
+
+
+class PointCharges:
+    def __init__(self, positions, charges, softening=0.0):
+        """
+        Coulomb field of point charges.
+
+        positions are given as (M, 2) or (M, 3) arrays (z = 0 for 2D input), charges in C.
+        softening (m) replaces r^2 by r^2 + softening^2 and keeps the field finite
+        for particles passing through a charge.
+        """
+        positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        self.positions = np.zeros((len(positions), 3))
+        self.positions[:, :positions.shape[1]] = positions
+        self.charges = np.asarray(charges, dtype=float)
+        self.softening = softening
+
+    def __call__(self, positions):
+        field = np.zeros_like(positions)
+        # One pass per source charge keeps the memory at O(N) for any number of particles
+        for source, q in zip(self.positions, self.charges):
+            d = positions - source
+            r2 = np.einsum('ij,ij->i', d, d) + self.softening ** 2
+            field += d * (k * q / (r2 * np.sqrt(r2)))[:, np.newaxis]
+        return field
+
+
+class GridField:
+    def __init__(self, x, y, Ex, Ey):
+        """
+        Field cached on a uniform grid in the xy plane, interpolated bilinearly.
+
+        x, y are the 1D grid coordinates, Ex, Ey arrays of shape (len(y), len(x)).
+        Outside the grid the field of the nearest edge is used; the z component is zero.
+        """
+        self.x0, self.y0 = x[0], y[0]
+        self.dx, self.dy = x[1] - x[0], y[1] - y[0]
+        self.nx, self.ny = len(x), len(y)
+        # Both components side by side, so one gather per corner
+        self.values = np.stack((Ex, Ey), axis=-1)
+
+    @classmethod
+    def from_field(cls, field, x, y, z=0.0):
+        """
+        Sample any field callable once on the grid (x, y) in the plane z.
+        """
+        X, Y = np.meshgrid(x, y)
+        points = np.column_stack((X.ravel(), Y.ravel(), np.full(X.size, z)))
+        values = field(points)
+        return cls(x, y, values[:, 0].reshape(X.shape), values[:, 1].reshape(X.shape))
+
+    def __call__(self, positions):
+        fx = np.clip((positions[:, 0] - self.x0) / self.dx, 0, self.nx - 1)
+        fy = np.clip((positions[:, 1] - self.y0) / self.dy, 0, self.ny - 1)
+        ix = np.minimum(fx.astype(np.int64), self.nx - 2)
+        iy = np.minimum(fy.astype(np.int64), self.ny - 2)
+        fx = (fx - ix)[:, np.newaxis]
+        fy = (fy - iy)[:, np.newaxis]
+
+        v = self.values
+        bottom = v[iy, ix] * (1 - fx) + v[iy, ix + 1] * fx
+        top = v[iy + 1, ix] * (1 - fx) + v[iy + 1, ix + 1] * fx
+        field = np.zeros_like(positions)
+        field[:, :2] = bottom * (1 - fy) + top * fy
+        return field
+
+
+# -----------------------------------------------------------------------------
+# Particle pusher
+# -----------------------------------------------------------------------------
+def boris_push(positions, velocities, q_over_m, field, dt, steps, B=None, absorb=None, record_every=0):
+    """
+    Push a batch of charged particles with the Boris scheme.
+
+    Velocities are kept at half steps (leapfrog); for B = None the scheme is
+    the velocity Verlet method. A uniform magnetic field B (3,) rotates the
+    velocity between the two electric half kicks.
+
+    Parameters
+    ----------
+    positions, velocities : ndarray (N, 3)
+        Initial state of the particles (m, m/s).
+    q_over_m : float or ndarray (N,)
+        Charge-to-mass ratio (C/kg), negative for electrons.
+    field : callable
+        Electric field, field(positions (N, 3)) -> E (N, 3) in V/m.
+    dt : float
+        Time step (s).
+    steps : int
+        Number of steps.
+    B : array_like (3,), optional
+        Uniform magnetic field (T).
+    absorb : callable, optional
+        absorb(positions) -> bool mask of particles that hit an electrode;
+        such particles are frozen at the point of impact.
+    record_every : int, optional
+        Store positions and velocities every record_every steps (0 - do not store).
+
+    Returns
+    -------
+    result : dict
+        positions, velocities - final state; alive - particles that were not absorbed;
+        hit_step - step of absorption (-1 for alive particles);
+        with record_every: t (n_records,), trajectory and trajectory_velocity (n_records, N, 3).
+    """
+    x = np.array(positions, dtype=float)
+    qm = np.asarray(q_over_m, dtype=float)
+    if qm.ndim:
+        qm = qm[:, np.newaxis]
+    n = len(x)
+
+    if B is not None:
+        t_vec = 0.5 * qm * dt * np.asarray(B, dtype=float)
+        s_vec = 2 * t_vec / (1 + np.sum(t_vec * t_vec, axis=-1, keepdims=True))
+
+    alive = np.ones(n, dtype=bool)
+    hit_step = np.full(n, -1)
+
+    # Velocities at half steps: v(-dt/2) from the electric field at the start
+    kick = 0.5 * dt * qm * field(x)
+    v = np.array(velocities, dtype=float) - kick
+
+    records_t, records_x, records_v = [], [], []
+    for step in range(steps + 1):
+        if record_every and step % record_every == 0:
+            records_t.append(step * dt)
+            records_x.append(x.copy())
+            records_v.append(v + kick)  # synchronous velocity v(t) = v(t - dt/2) + kick
+        if step == steps:
+            break
+
+        # Half kick, magnetic rotation, half kick
+        v_minus = v + kick
+        if B is not None:
+            v_prime = v_minus + np.cross(v_minus, t_vec)
+            v_minus = v_minus + np.cross(v_prime, s_vec)
+        v_new = v_minus + kick
+        x_new = x + v_new * dt
+
+        # Frozen particles keep their state
+        if not alive.all():
+            v_new[~alive] = v[~alive]
+            x_new[~alive] = x[~alive]
+        v, x = v_new, x_new
+
+        if absorb is not None:
+            hit = alive & absorb(x)
+            hit_step[hit] = step + 1
+            alive &= ~hit
+        kick = 0.5 * dt * qm * field(x)
+        if not alive.all():
+            kick[~alive] = 0.0
+
+    result = {"positions": x, "velocities": v + kick, "alive": alive, "hit_step": hit_step}
+    if record_every:
+        result["t"] = np.array(records_t)
+        result["trajectory"] = np.array(records_x)
+        result["trajectory_velocity"] = np.array(records_v)
+    return result
+
+
+def benchmark(n=100000, steps=100):
+    """
+    Particle-steps per second for a beam of electrons in a cylindrical capacitor,
+    with the analytic field and with the same field cached on a 512x512 grid.
+    """
+    e, m = 1.6e-19, 9.11e-31
+    capacitor = CylindricalCapacitor(0.06, 0.13, -50.0, axis=(-0.095, 0.0))
+
+    rng = np.random.default_rng(0)
+    positions = np.zeros((n, 3))
+    positions[:, 1] = rng.uniform(-0.02, 0.02, n)
+    velocities = np.zeros((n, 3))
+    velocities[:, 0] = 3.5e6
+    velocities[:, 1] = rng.normal(0.0, 1e4, n)
+    dt = 0.21 / 3.5e6 / steps
+
+    grid = GridField.from_field(capacitor, np.linspace(-0.01, 0.22, 512), np.linspace(-0.04, 0.04, 512))
+    for name, field in (("analytic", capacitor), ("grid", grid)):
+        start = time.perf_counter()
+        boris_push(positions, velocities, -e / m, field, dt, steps, absorb=capacitor.absorbed)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8}: {n * steps / elapsed:.3e} particle-steps/s ({elapsed:.2f} s for {n} particles)")
+
+
+if __name__ == "__main__":
+    benchmark()